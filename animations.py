@@ -1,15 +1,24 @@
 import math
+import os
+import sys
 from cosmic import CosmicUnicorn
 from picographics import PicoGraphics, DISPLAY_COSMIC_UNICORN
 import time
+from effect_cache import EffectCache, _apply_888
 
-class AnimationManager:
-    import eyes_move
-    import leftarm_up
-    import leftarm_down
-    import rightarm_up
-    import rightarm_down
+# Raw framebuffer dump of the static base, written on first boot and blitted on every boot after
+BASE_CACHE_PATH = "base.raw"
+BASE_CACHE_MAGIC = b"MKB3"
+# Version stamp next to makey_arrays, written by tools/build_mpy.py
+BASE_STAMP_SUFFIX = ".crc"
+
+# Looping effects repeat exactly every *_PERIOD frames so they can be cached
+TWO_PI = 2 * math.pi
+RAINBOW_PERIOD = 90
+# Phase wraps at a multiple of every effect period so the loops stay seamless
+PHASE_WRAP = 9000
 
+class AnimationManager:
     def __init__(self, graphics, mask_red, mask_white, base_image):
         self.graphics = graphics
         self.mask_red = set(mask_red)  # Convert to set for fast lookup
@@ -26,20 +35,34 @@ class AnimationManager:
         self.left_eye_region = [(12, 5), (13, 5), (12, 6), (13, 6)]
         self.right_eye_region = [(18, 5), (19, 5), (18, 6), (19, 6)]
         
-        # Precompute base pens for static parts
-        self.base_pen_map = {}
-        for y in range(self.height):
-            for x in range(self.width):
-                if (x, y) not in self.mask_red and (x, y) not in self.mask_white:
-                    r, g, b = self.base_image[y][x]
-                    self.base_pen_map[(x, y)] = self.graphics.create_pen(r, g, b)
+        # Base pens are only built when the cached base render is missing
+        self.base_pen_map = None
         
         self.white_pen = self.graphics.create_pen(255, 255, 255)
         
-        # Draw static parts (base + white) once at startup
-        self.draw_static_base()
+        # Draw static parts (base + white) once at startup, from the cache if we can
+        if not self.load_base_cache():
+            self.draw_static_base()
+            self.save_base_cache()
         
         self.current_color = (255, 0, 0)  # Default to red
+        
+        # One period of rainbow is recorded on first use and replayed after that
+        self.framebuffer = memoryview(self.graphics)
+        red_offsets = [(y * self.width + x) * 4 for x, y in sorted(self.mask_red)]
+        self.effect_cache = EffectCache(self.framebuffer, red_offsets)
+        
+        # Fire, eyes and the plugin effects are set up on first use, boot doesn't pay for them
+        self.fire = None
+        self.eyes = None
+        self.effects = None
+        self.effect = None
+        self.effect_name = None
+        self.effect_geometry = None
+        self.effect_buf = None
+        self.effect_period = 0
+        self.effect_cacheable = False
+        self.effect_draws_white = False
     
     def from_hsv(self, h, s, v):
         """HSV to RGB helper function"""
@@ -64,8 +87,60 @@ class AnimationManager:
         if i == 5:
             return int(v), int(p), int(q)
     
+    def build_base_pens(self):
+        """Precompute base pens for static parts"""
+        self.base_pen_map = {}
+        for y in range(self.height):
+            for x in range(self.width):
+                if (x, y) not in self.mask_red and (x, y) not in self.mask_white:
+                    r, g, b = self.base_image[y][x]
+                    self.base_pen_map[(x, y)] = self.graphics.create_pen(r, g, b)
+    
+    def base_cache_header(self):
+        """
+        Header stored in front of the cached base render. Carries the version stamp
+        tools/build_mpy.py writes next to makey_arrays (a CRC32 of its source), or
+        the module's file size without one, so editing the art rebuilds the cache.
+        """
+        key = 0
+        module = sys.modules.get("makey_arrays")
+        path = getattr(module, "__file__", None)
+        if path:
+            try:
+                with open(path[:path.rfind(".")] + BASE_STAMP_SUFFIX) as f:
+                    key = int(f.read().strip(), 16)
+            except (OSError, ValueError):
+                try:
+                    key = os.stat(path)[6]
+                except OSError:
+                    pass
+        return BASE_CACHE_MAGIC + (key & 0xFFFFFFFF).to_bytes(4, "little")
+    
+    def load_base_cache(self, path=BASE_CACHE_PATH):
+        """Blit the cached base render straight into the framebuffer. Returns False if there is no usable cache."""
+        fb = memoryview(self.graphics)
+        header = self.base_cache_header()
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(header)) != header:
+                    return False
+                return f.readinto(fb) == len(fb)
+        except OSError:
+            return False
+    
+    def save_base_cache(self, path=BASE_CACHE_PATH):
+        """Write the current framebuffer (static base only) out as the base cache"""
+        try:
+            with open(path, "wb") as f:
+                f.write(self.base_cache_header())
+                f.write(memoryview(self.graphics))
+        except OSError as e:
+            print("Could not write base cache:", e)
+    
     def draw_static_base(self):
         """Draw the static base image (white outline and base image)"""
+        if self.base_pen_map is None:
+            self.build_base_pens()
         for y in range(self.height):
             for x in range(self.width):
                 if (x, y) in self.mask_white:
@@ -82,9 +157,18 @@ class AnimationManager:
             self.graphics.set_pen(self.graphics.create_pen(255, 0, 0))
             self.graphics.pixel(x, y)
     
+    def invalidate_effects(self):
+        """Call after drawing over the mask so cached effects redraw it fully"""
+        self.effect_cache.last_index = -1
+        if self.eyes is not None:
+            self.eyes.invalidate()
+    
     def draw_rainbow(self):
         """Draw rainbow animation - red pixels cycle through rainbow colors"""
-        phase_percent = self.phase / 15.0
+        if self.effect_cache.play("rainbow", self.phase):
+            return
+        # One full turn of the stripes per period, close to the old phase / 15
+        phase_percent = self.phase * TWO_PI / RAINBOW_PERIOD
         
         # Only draw the red pixels (static base is already drawn)
         for x, y in self.mask_red:
@@ -94,39 +178,83 @@ class AnimationManager:
             pen = self.graphics.create_pen(r, g, b)
             self.graphics.set_pen(pen)
             self.graphics.pixel(x, y)
+        self.effect_cache.record("rainbow", self.phase, RAINBOW_PERIOD)
     
     def draw_fire(self):
-        """Draw fire-like animation - red pixels flicker like fire with orange/yellow colors"""
-        # Only draw the red pixels (static base is already drawn)
-        for x, y in self.mask_red:
-            # Create fire effect with multiple sine waves for realistic flickering
-            base_intensity = (math.sin((x + y) / 3.0 + self.phase / 15.0) + 1.0) / 2.0
-            flicker = (math.sin(self.phase / 8.0 + x * 0.5) + 1.0) / 2.0
-            wave = (math.sin((x + y) / 2.0 + self.phase / 20.0) + 1.0) / 2.0
-            
-            # Combine effects for realistic fire
-            intensity = (base_intensity * 0.6 + flicker * 0.3 + wave * 0.1)
-            intensity = max(0.3, min(1.0, intensity))  # Keep fire bright
-            
-            # Fire colors: red to orange to yellow
-            if intensity > 0.8:
-                # Yellow/orange tip of flame
-                r = int(255 * intensity)
-                g = int(200 * intensity)
-                b = int(50 * intensity)
-            elif intensity > 0.6:
-                # Orange middle
-                r = int(255 * intensity)
-                g = int(150 * intensity)
-                b = int(30 * intensity)
-            else:
-                # Red base
-                r = int(255 * intensity)
-                g = int(80 * intensity)
-                b = int(20 * intensity)
-            
-            self.graphics.set_pen(self.graphics.create_pen(r, g, b))
+        """Draw fire animation - a heat simulation over the mask, mapped through the fire palette"""
+        if self.fire is None:
+            from fire import FireEngine
+            self.fire = FireEngine(self.mask_red)
+        self.fire.step()
+        self.fire.render(self.framebuffer)
+    
+    def effect_registry(self):
+        """The plugin effects from the effects package, only looked up on first use"""
+        if self.effects is None:
+            from effects import Registry
+            self.effects = Registry(self.mask_red, self.mask_white)
+        return self.effects
+    
+    def start_effect(self, name):
+        """Switch to a plugin effect by name. Raises KeyError if there is no such effect."""
+        if name == self.effect_name:
+            return
+        from effects import REGION_RED, REGION_WHITE
+        effect, geometry = self.effect_registry().create(name)
+        period = getattr(effect, "PERIOD", 0)
+        if period and PHASE_WRAP % period:
+            # It would jump every time the phase wraps, and a cache couldn't line up
+            print("[EFFECT]", name, "period", period, "doesn't divide", PHASE_WRAP, "- rendering live")
+            period = 0
+        self.effect = effect
+        self.effect_name = name
+        self.effect_geometry = geometry
+        self.effect_buf = bytearray(geometry.count * 3)
+        self.effect_period = period
+        regions = getattr(effect, "REGIONS", REGION_RED)
+        # The cache only covers the red mask
+        self.effect_cacheable = period > 0 and regions == REGION_RED
+        self.effect_draws_white = bool(regions & REGION_WHITE)
+    
+    def leave_effect(self):
+        """Put the white outline back if the effect drew over it, no other mode redraws it"""
+        if self.effect is None or not self.effect_draws_white:
+            return
+        self.graphics.set_pen(self.white_pen)
+        for x, y in self.mask_white:
             self.graphics.pixel(x, y)
+        if self.eyes is not None:
+            self.eyes.invalidate()
+    
+    def draw_effect(self):
+        """Draw the next frame of the current plugin effect"""
+        cacheable = self.effect_cacheable
+        if cacheable and self.effect_cache.play(self.effect_name, self.phase):
+            return
+        self.effect.render(self.phase, self.effect_buf)
+        geometry = self.effect_geometry
+        _apply_888(self.framebuffer, geometry.offsets, self.effect_buf, geometry.count << 1)
+        if cacheable:
+            self.effect_cache.record(self.effect_name, self.phase, self.effect_period)
+    
+    def draw_eyes_blinking(self):
+        """Blink now and then with the eyes looking straight ahead. Returns True if any eye pixel changed."""
+        return self.eye_engine().update(False, self.current_color)
+    
+    def draw_eyes_crazy(self):
+        """Pupils dart around, each eye on its own, with quicker blinks. Returns True if any eye pixel changed."""
+        return self.eye_engine().update(True, self.current_color)
+    
+    def eye_engine(self):
+        if self.eyes is None:
+            from eyes import EyeEngine
+            self.eyes = EyeEngine(self.graphics, self.left_eye_region, self.right_eye_region)
+        return self.eyes
+    
+    def restore_eyes(self):
+        """Open white eyes again after blinking/crazy mode, nothing else redraws those pixels"""
+        if self.eyes is not None:
+            self.eyes.reset()
     
     def draw_eyes_moving(self):
         """
@@ -135,6 +263,7 @@ class AnimationManager:
         Extra debug: print frame index before/after.
         Display update is handled by main loop.
         """
+        import eyes_move  # Frame modules are imported when first used, not at boot
         if not hasattr(self, '_eyes_frame_index'):
             self._eyes_frame_index = 0
         print(f"[DEBUG] Current frame index: {self._eyes_frame_index}")
@@ -165,7 +294,7 @@ class AnimationManager:
     def update_rainbow_phase(self):
         """Update the rainbow animation phase - call this each frame"""
         self.phase += 1
-        if self.phase > 10000:  # Wrap to avoid large numbers
+        if self.phase >= PHASE_WRAP:  # Wrap to avoid large numbers
             self.phase = 0
     
     def reset_phase(self):
@@ -227,6 +356,7 @@ class AnimationManager:
         print(f"[DEBUG] Next laugh frame index will be: {self._laugh_frame_index}")
 
     def draw_leftarm_up(self):
+        import leftarm_up
         if not hasattr(self, '_leftarm_up_frame_index'):
             self._leftarm_up_frame_index = 0
 
@@ -0,0 +1,110 @@
+import struct
+import time
+
+# Ring buffer of received commands on flash, pulled off with
+#   mpremote cp :commands.log .
+# and fed back through the simulator with tools/replay.py.
+#
+# Layout: header, then CAPACITY fixed-size records.
+#   header: magic, record size, capacity, index of next write, record count
+#   record: ticks_ms when received (uint32), command length (uint8), command bytes
+COMMAND_LOG_PATH = "commands.log"
+COMMAND_LOG_MAGIC = b"MKCL"
+HEADER_FORMAT = "<4sHHHH"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_SIZE = 32
+MAX_COMMAND_LENGTH = RECORD_SIZE - 5
+
+# ticks_ms() wraps at 2**30 on MicroPython
+TICKS_PERIOD = 1 << 30
+
+
+class CommandRecorder:
+    """Appends every received command with its timestamp to a fixed-size ring file"""
+
+    def __init__(self, path=COMMAND_LOG_PATH, capacity=1024):
+        self.path = path
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+        self.record = bytearray(RECORD_SIZE)
+        self.enabled = True
+        try:
+            with open(path, "rb") as f:
+                magic, record_size, capacity, head, count = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+            if magic == COMMAND_LOG_MAGIC and record_size == RECORD_SIZE and capacity == self.capacity \
+                    and head < capacity and count <= capacity:
+                # Keep recording after whatever was there from the last show
+                self.head = head
+                self.count = count
+                return
+        except (OSError, ValueError, struct.error):
+            # Missing, truncated or garbled header - start over
+            pass
+        try:
+            self.reset()
+        except OSError as e:
+            # Full or read-only flash shouldn't stop the show, just the recording
+            print("Could not create command log, not recording:", e)
+            self.enabled = False
+
+    def reset(self):
+        """Start a fresh, empty log"""
+        self.head = 0
+        self.count = 0
+        with open(self.path, "wb") as f:
+            f.write(self.header())
+            # Preallocate so appending never has to grow the file mid-show
+            empty = bytes(RECORD_SIZE)
+            for _ in range(self.capacity):
+                f.write(empty)
+
+    def header(self):
+        return struct.pack(HEADER_FORMAT, COMMAND_LOG_MAGIC, RECORD_SIZE, self.capacity, self.head, self.count)
+
+    def record_command(self, cmd, ticks=None):
+        """Store one command. Long commands are truncated, recording errors are only printed."""
+        if not self.enabled:
+            return
+        if ticks is None:
+            ticks = time.ticks_ms()
+        data = cmd.encode()[:MAX_COMMAND_LENGTH]
+        record = self.record
+        struct.pack_into("<IB", record, 0, ticks, len(data))
+        record[5:5 + len(data)] = data
+        try:
+            with open(self.path, "r+b") as f:
+                f.seek(HEADER_SIZE + self.head * RECORD_SIZE)
+                f.write(record)
+                self.head = (self.head + 1) % self.capacity
+                self.count = min(self.count + 1, self.capacity)
+                f.seek(0)
+                f.write(self.header())
+        except OSError as e:
+            print("Could not record command:", e)
+
+
+def read_command_log(path=COMMAND_LOG_PATH):
+    """
+    Return the recorded commands oldest first as a list of (ms, cmd), with ms
+    counted from the first command so tick wrap-around doesn't matter.
+    """
+    with open(path, "rb") as f:
+        magic, record_size, capacity, head, count = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+        if magic != COMMAND_LOG_MAGIC:
+            raise ValueError("Not a command log: " + path)
+        data = f.read(record_size * capacity)
+
+    commands = []
+    elapsed = 0
+    previous = None
+    first = (head - count) % capacity
+    for i in range(count):
+        offset = ((first + i) % capacity) * record_size
+        ticks, length = struct.unpack_from("<IB", data, offset)
+        cmd = bytes(data[offset + 5:offset + 5 + length]).decode()
+        if previous is not None:
+            elapsed += (ticks - previous) % TICKS_PERIOD
+        previous = ticks
+        commands.append((elapsed, cmd))
+    return commands
@@ -17,4 +17,85 @@ def connect_wifi(ssid, password, timeout=10):
             time.sleep(0.5)
 
     print("✅ Connected:", wlan.ifconfig())
-    return wlan
\ No newline at end of file
+    return wlan
+
+class WifiManager:
+    """
+    Non-blocking Wi-Fi connection that keeps itself up in the background.
+    Call poll() from the main loop; it never sleeps. Failed attempts back off
+    exponentially and a dropped link is retried straight away.
+    on_connect(wlan) / on_disconnect() are called on every link change.
+    """
+    STATE_DOWN = 0
+    STATE_CONNECTING = 1
+    STATE_UP = 2
+
+    def __init__(self, ssid, password, on_connect=None, on_disconnect=None,
+                 connect_timeout_ms=10000, backoff_min_ms=1000, backoff_max_ms=60000,
+                 poll_interval_ms=250):
+        self.ssid = ssid
+        self.password = password
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.connect_timeout_ms = connect_timeout_ms
+        self.backoff_min_ms = backoff_min_ms
+        self.backoff_max_ms = backoff_max_ms
+        self.poll_interval_ms = poll_interval_ms
+
+        self.wlan = network.WLAN(network.STA_IF)
+        self.wlan.active(True)
+
+        self.state = self.STATE_DOWN
+        self.backoff_ms = backoff_min_ms
+        self.failures = 0  # Failed attempts since the link was last up
+        now = time.ticks_ms()
+        self.next_attempt = now
+        self.last_poll = time.ticks_add(now, -poll_interval_ms)
+        self.attempt_start = now
+
+    def isconnected(self):
+        return self.state == self.STATE_UP
+
+    def offline(self):
+        """True once an attempt has failed or the link dropped, i.e. not just booting"""
+        return self.state != self.STATE_UP and self.failures > 0
+
+    def poll(self):
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.last_poll) < self.poll_interval_ms:
+            return
+        self.last_poll = now
+
+        if self.state == self.STATE_UP:
+            if not self.wlan.isconnected():
+                print("Wi-Fi lost, reconnecting...")
+                self.state = self.STATE_DOWN
+                self.failures = 1
+                self.backoff_ms = self.backoff_min_ms
+                self.next_attempt = now
+                if self.on_disconnect:
+                    self.on_disconnect()
+
+        elif self.state == self.STATE_DOWN:
+            if time.ticks_diff(now, self.next_attempt) >= 0:
+                print(f"Connecting to Wi-Fi '{self.ssid}'...")
+                self.wlan.connect(self.ssid, self.password)
+                self.state = self.STATE_CONNECTING
+                self.attempt_start = now
+
+        elif self.state == self.STATE_CONNECTING:
+            if self.wlan.isconnected():
+                print("✅ Connected:", self.wlan.ifconfig())
+                self.state = self.STATE_UP
+                self.failures = 0
+                self.backoff_ms = self.backoff_min_ms
+                if self.on_connect:
+                    self.on_connect(self.wlan)
+            elif (self.wlan.status() < 0 or
+                  time.ticks_diff(now, self.attempt_start) > self.connect_timeout_ms):
+                self.failures += 1
+                print("Wi-Fi attempt", self.failures, "failed, retrying in", self.backoff_ms, "ms")
+                self.wlan.disconnect()
+                self.state = self.STATE_DOWN
+                self.next_attempt = time.ticks_add(now, self.backoff_ms)
+                self.backoff_ms = min(self.backoff_ms * 2, self.backoff_max_ms)
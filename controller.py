@@ -0,0 +1,334 @@
+import time
+from transitions import Transition
+
+# Modes
+MODE_RED = 0
+MODE_RAINBOW = 1
+MODE_STATIC = 2
+MODE_FIRE = 3
+MODE_EYES_MOVING = 4
+MODE_EYES_BLINKING = 5
+MODE_EYES_CRAZY = 6
+MODE_EFFECT = 7  # Plugin from the effects package, see AnimationManager.start_effect
+
+# Modes that redraw the whole mask every frame themselves
+MASK_ANIMATING_MODES = (MODE_RAINBOW, MODE_FIRE, MODE_EFFECT)
+
+# Modes drawn by the eye engine, which leaves the eyes mid-blink or looking away
+EYES_MODES = (MODE_EYES_BLINKING, MODE_EYES_CRAZY)
+
+# Shown while Wi-Fi is down so the mascot doesn't just freeze
+OFFLINE_MODE = MODE_RAINBOW
+
+# Commands that change what's on screen blend into it instead of cutting
+TRANSITION_COMMANDS = ("red", "blue", "green", "purple", "pink", "rainbow", "static", "fire",
+                       "eyes_moving", "eyes_blinking", "eyes_crazy", "leftarm_up", "leftarm_down",
+                       "rightarm_up", "rightarm_down", "dance_1", "dance_2")
+
+COMMANDS_HELP = ("red, rainbow, static, fire, eyes_moving, eyes_blinking, eyes_crazy, stats, effects, "
+                 "brightness <0-100>, gamma <0.5-4.0>, autodim <on|off>, power [mA|off], transition <fade|wipe|dissolve|none> [frames]")
+
+
+class Controller:
+    """
+    Command handling and frame scheduling for the mascot, shared by main.py and
+    the host-side tools so they run exactly the same code.
+    Display updates go through update() and the Display's gamma/brightness stage; sleeps go through the sleep function
+    passed in, so the simulator can run them on a virtual clock.
+    """
+
+    def __init__(self, display, graphics, anim_manager, frame_delay=33, sleep=None):
+        self.display = display
+        self.graphics = graphics
+        self.anim_manager = anim_manager
+        self.frame_delay = frame_delay  # ~30 FPS
+        self.sleep = sleep or time.sleep
+        self.mode = MODE_RED
+        self.offline = False
+        self.last_draw_time = time.ticks_ms()
+        self.transition = Transition(memoryview(graphics))
+
+        # Frame rate and main loop stall tracking for the stats command
+        self.boot_ms = None
+        self.frames = 0
+        self.fps = 0.0
+        self.fps_window_start = self.last_draw_time
+        self.fps_window_frames = 0
+        self.last_tick_time = self.last_draw_time
+        self.max_stall_ms = 0
+
+    def update(self):
+        blending = self.transition.blend()
+        self.display.update(self.graphics)
+        if blending:
+            self.transition.restore()
+        self.frames += 1
+        self.fps_window_frames += 1
+        now = time.ticks_ms()
+        elapsed = time.ticks_diff(now, self.fps_window_start)
+        if elapsed >= 1000:
+            self.fps = self.fps_window_frames * 1000 / elapsed
+            self.fps_window_start = now
+            self.fps_window_frames = 0
+
+    def stats(self, reset=True):
+        """
+        Frame rate over the last second, the longest main loop stall and the peak power estimate since the last reset.
+        With reset=False nothing is written, so core 0 can call it while core 1 renders (and reset through the worker).
+        """
+        display = self.display
+        response = (f"OK: fps={self.fps:.1f} frames={self.frames} max_stall_ms={self.max_stall_ms} boot_ms={self.boot_ms} "
+                    f"power_ma={display.power_ma} peak_ma={display.peak_ma} power_limit={display.power_limit:.2f}")
+        if reset:
+            self.reset_stats()
+        return response
+
+    def reset_stats(self):
+        self.max_stall_ms = 0
+        self.display.peak_ma = 0
+
+    def power(self):
+        display = self.display
+        budget = f"{display.power_budget_ma} mA" if display.power_budget_ma else "off"
+        return (f"OK: power {display.power_ma} mA (peak {display.peak_ma} mA), budget {budget}, "
+                f"limit {round(display.power_limit * 100)}%")
+
+    def leave_mode(self):
+        """Undo what the current mode drew outside the red mask, before another mode takes over"""
+        if self.mode in EYES_MODES:
+            # Eyes left mid-blink or looking away
+            self.anim_manager.restore_eyes()
+        elif self.mode == MODE_EFFECT:
+            self.anim_manager.leave_effect()
+
+    def commands_help(self):
+        """COMMANDS_HELP plus the plugin effects that are installed"""
+        return ", ".join([COMMANDS_HELP] + self.anim_manager.effect_registry().available)
+
+    def handle_command(self, cmd):
+        """Apply one command and return the response line (without newline)"""
+        anim_manager = self.anim_manager
+        frame_delay = self.frame_delay
+        # Most commands draw over the mask, cached effects have to start from a full frame
+        anim_manager.invalidate_effects()
+        if cmd in TRANSITION_COMMANDS or cmd in anim_manager.effect_registry():
+            self.transition.begin()
+        if cmd in TRANSITION_COMMANDS or cmd == "laugh" or cmd in anim_manager.effect_registry():
+            self.leave_mode()
+
+        if cmd in ["red", "blue", "green", "purple", "pink"]:
+            self.mode = MODE_RED
+            anim_manager.set_mask_color(cmd)
+            anim_manager.draw_mask_color()
+            self.update()
+            response = f"OK: {cmd.upper()} mode"
+        elif cmd == "rainbow":
+            self.mode = MODE_RAINBOW
+            response = "OK: RAINBOW mode 🌈"
+        elif cmd == "static":
+            self.mode = MODE_STATIC
+            anim_manager.draw_static()
+            self.update()
+            response = "OK: STATIC mode"
+        elif cmd == "fire":
+            self.mode = MODE_FIRE
+            response = "OK: FIRE mode 🔥"
+        elif cmd == "eyes_moving":
+            self.mode = MODE_EYES_MOVING
+            response = "OK: EYES MOVING mode 👀"
+            # Run the eyes animation loop twice, then stop
+            from eyes_move import animation_frames
+            for _ in range(2 * len(animation_frames)):
+                anim_manager.draw_eyes_moving()
+                self.update()
+                self.sleep(frame_delay / 1000.0)
+            self.mode = MODE_STATIC
+        elif cmd == "eyes_blinking":
+            self.mode = MODE_EYES_BLINKING
+            response = "OK: EYES BLINKING mode 😉"
+        elif cmd == "eyes_crazy":
+            self.mode = MODE_EYES_CRAZY
+            response = "OK: EYES CRAZY mode 😵"
+        elif cmd == "laugh":
+            self.mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
+            response = "OK: LAUGH mode 😆"
+            from laugh import animation_frames
+            for i in range(2 * len(animation_frames)):
+                anim_manager.draw_laugh()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(0.5)
+            self.mode = MODE_STATIC
+        elif cmd == "leftarm_up":
+            self.mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
+            response = "OK: leftarm_up mode 😆"
+            from leftarm_up import animation_frames
+            for i in range(1 * len(animation_frames)):
+                anim_manager.draw_leftarm_up()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(frame_delay / 1000.0)
+            self.mode = MODE_STATIC
+        elif cmd == "leftarm_down":
+            self.mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
+            response = "OK: leftarm_down mode 😆"
+            from leftarm_down import animation_frames
+            for i in range(1 * len(animation_frames)):
+                anim_manager.draw_leftarm_down()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(frame_delay / 1000.0)
+            self.mode = MODE_STATIC
+        elif cmd == "rightarm_up":
+            self.mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
+            response = "OK: rightarm_up mode 😆"
+            from rightarm_up import animation_frames
+            for i in range(1 * len(animation_frames)):
+                anim_manager.draw_rightarm_up()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(frame_delay / 1000.0)
+            self.mode = MODE_STATIC
+        elif cmd == "rightarm_down":
+            self.mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
+            response = "OK: rightarm_down mode 😆"
+            from rightarm_down import animation_frames
+            for i in range(1 * len(animation_frames)):
+                anim_manager.draw_rightarm_down()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(frame_delay / 1000.0)
+            self.mode = MODE_STATIC
+        elif cmd == "dance_1":
+            self.mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
+            response = "OK: dance_1 mode 😆"
+            import leftarm_up
+            for i in range(1 * len(leftarm_up.animation_frames)):
+                anim_manager.draw_leftarm_up()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(frame_delay / 1000.0)
+            for i in range(1 * len(leftarm_up.animation_frames)):
+                anim_manager.draw_leftarm_down()
+                anim_manager.draw_rightarm_up()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(frame_delay / 1000.0)
+            for i in range(1 * len(leftarm_up.animation_frames)):
+                anim_manager.draw_leftarm_up()
+                anim_manager.draw_rightarm_down()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(frame_delay / 1000.0)
+            self.mode = MODE_STATIC
+        elif cmd == "dance_2":
+            self.mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
+            response = "OK: dance_1 mode 😆"
+            import dance_1
+            for i in range(1 * len(dance_1.animation_frames)):
+                anim_manager.draw_dance_1()
+                self.update()
+                # Add a longer delay after each frame
+                self.sleep(frame_delay / 1000.0)
+            self.mode = MODE_STATIC
+        elif cmd == "stats":
+            response = self.stats()
+        elif cmd == "effects":
+            response = "OK: effects " + ", ".join(anim_manager.effect_registry().available)
+        elif cmd in anim_manager.effect_registry():
+            try:
+                anim_manager.start_effect(cmd)
+                self.mode = MODE_EFFECT
+                response = f"OK: {cmd.upper()} effect"
+            except Exception as e:
+                print("[EFFECT] failed to start", cmd, "-", e)
+                response = f"ERROR: effect {cmd} failed to start"
+        elif cmd.startswith("brightness "):
+            try:
+                self.display.set_brightness(int(cmd[11:]) / 100)
+                self.update()
+                response = f"OK: brightness {round(self.display.brightness * 100)}%"
+            except ValueError:
+                response = "ERROR: brightness takes 0-100"
+        elif cmd.startswith("gamma "):
+            try:
+                self.display.set_gamma(float(cmd[6:]))
+                self.update()
+                response = f"OK: gamma {self.display.gamma}"
+            except ValueError:
+                response = "ERROR: gamma takes a number like 1.2"
+        elif cmd.startswith("transition "):
+            args = cmd.split()
+            try:
+                self.transition.configure(args[1], int(args[2]) if len(args) > 2 else None)
+                response = f"OK: {self.transition.kind} transition over {self.transition.frames} frames"
+            except (ValueError, IndexError):
+                response = "ERROR: transition takes fade, wipe, dissolve or none and an optional frame count"
+        elif cmd == "power":
+            response = self.power()
+        elif cmd.startswith("power "):
+            try:
+                self.display.set_power_budget(0 if cmd == "power off" else int(cmd[6:]))
+                self.update()
+                response = self.power()
+            except ValueError:
+                response = "ERROR: power takes a budget in mA or off"
+        elif cmd in ("autodim on", "autodim off"):
+            self.display.set_auto_dim(cmd == "autodim on")
+            response = f"OK: auto-dimming {cmd[8:]}"
+        else:
+            response = f"ERROR: Unknown command '{cmd}'. Available: {self.commands_help()}"
+
+        return response
+
+    def set_offline(self, offline):
+        """Switch to/from the offline animation"""
+        if offline != self.offline:
+            self.transition.begin()
+            if offline:
+                self.leave_mode()
+        if self.offline and not offline and self.mode not in MASK_ANIMATING_MODES:
+            # Back online, put the chosen color back over the offline animation - nothing else redraws the mask
+            self.anim_manager.draw_mask_color()
+            self.anim_manager.invalidate_effects()
+            self.update()
+        self.offline = offline
+
+    def tick(self):
+        """Draw the next frame of an animated mode if one is due. Returns True if it drew."""
+        draw_mode = OFFLINE_MODE if self.offline else self.mode
+        anim_manager = self.anim_manager
+
+        now = time.ticks_ms()
+        stall = time.ticks_diff(now, self.last_tick_time)
+        if stall > self.max_stall_ms:
+            self.max_stall_ms = stall
+        self.last_tick_time = now
+        if (draw_mode == MODE_RAINBOW or draw_mode == MODE_FIRE or draw_mode == MODE_EYES_MOVING or
+            draw_mode == MODE_EYES_BLINKING or draw_mode == MODE_EYES_CRAZY or draw_mode == MODE_EFFECT) and time.ticks_diff(now, self.last_draw_time) >= self.frame_delay:
+            self.last_draw_time = now
+            if draw_mode == MODE_RAINBOW:
+                anim_manager.update_rainbow_phase()
+                anim_manager.draw_rainbow()
+            elif draw_mode == MODE_FIRE:
+                anim_manager.update_rainbow_phase()
+                anim_manager.draw_fire()
+            elif draw_mode == MODE_EFFECT:
+                anim_manager.update_rainbow_phase()
+                anim_manager.draw_effect()
+            elif draw_mode == MODE_EYES_BLINKING or draw_mode == MODE_EYES_CRAZY:
+                # Most frames the eyes don't change, skip the display update then
+                if draw_mode == MODE_EYES_BLINKING:
+                    changed = anim_manager.draw_eyes_blinking()
+                else:
+                    changed = anim_manager.draw_eyes_crazy()
+                if not changed and not self.transition.active:
+                    return False
+            self.update()
+            return True
+        if self.transition.active and time.ticks_diff(now, self.last_draw_time) >= self.frame_delay:
+            # Static modes still need frames while a transition plays out
+            self.last_draw_time = now
+            self.update()
+            return True
+        return False
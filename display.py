@@ -0,0 +1,235 @@
+import time
+import micropython
+from array import array
+
+# The Cosmic Unicorn framebuffer is RGB888: one little-endian uint32 0x00RRGGBB per pixel
+WIDTH = 32
+HEIGHT = 32
+BYTES_PER_PIXEL = 4
+R = 2  # Byte offsets within a pixel
+G = 1
+B = 0
+
+DEFAULT_BRIGHTNESS = 0.5
+# Extra gamma on top of the driver's own curve, 1.0 leaves colors as drawn
+DEFAULT_GAMMA = 1.0
+# The Cosmic Unicorn driver maps each channel through its own 14-bit gamma table
+# (about 1.8), so our LUT doesn't need a curve of its own. Its brightness is applied
+# as an 8-bit (v * brightness) >> 8 ahead of that table, which rounds dark values
+# down to 0, so the driver is kept at full brightness and ours goes in the LUT.
+DRIVER_GAMMA = 1.8
+
+# Auto-dimming reads the light sensor this often and never goes below AUTO_DIM_MIN
+AUTO_DIM_INTERVAL_MS = 2000
+AUTO_DIM_MIN = 0.2
+AUTO_DIM_FULL_LIGHT = 2048  # cu.light() reading treated as full daylight
+
+# Rough power model, current drawn for a frame is
+#   POWER_IDLE_MA + POWER_FULL_MA * (sum of driver duty per output channel) / (pixels * 3 * 255)
+# Measured-ish figures for a Pico W on a Cosmic Unicorn, calibrate with a USB meter.
+POWER_IDLE_MA = 120
+POWER_FULL_MA = 3000  # Every LED of every pixel at 255
+DEFAULT_POWER_BUDGET_MA = 1500
+# Limit steps: go down with this much margin, only come back up in steps of at least POWER_STEP
+POWER_MARGIN = 0.97
+POWER_STEP = 1.1
+
+
+# Both passes take the LUT buffer: red, green, blue LUTs then the 256-entry duty
+# table the power estimate sums up (viper functions take at most four arguments).
+
+@micropython.viper
+def apply_lut(buf: ptr8, lut: ptr8, size: int) -> int:
+    """Map every pixel of an RGB888 framebuffer through the red/green/blue LUTs in place, returns the summed duty of the output"""
+    total = 0
+    i = 0
+    while i < size:
+        b = lut[512 + buf[i]]
+        g = lut[256 + buf[i + 1]]
+        r = lut[buf[i + 2]]
+        buf[i] = b
+        buf[i + 1] = g
+        buf[i + 2] = r
+        total += lut[768 + r] + lut[768 + g] + lut[768 + b]
+        i += 4
+    return total
+
+
+@micropython.viper
+def frame_duty(buf: ptr8, lut: ptr8, size: int) -> int:
+    """Summed duty of an RGB888 framebuffer as it is, for when the LUTs would change nothing"""
+    total = 0
+    i = 0
+    while i < size:
+        total += lut[768 + buf[i]] + lut[768 + buf[i + 1]] + lut[768 + buf[i + 2]]
+        i += 4
+    return total
+
+
+class Display:
+    """
+    Drop-in for cu.update(graphics) that applies brightness, white balance and an
+    optional extra gamma on the way out, plus a power limit.
+
+    The driver runs at full brightness. Global brightness (brightness x auto-dim x
+    power limit), balance and extra gamma go into per-channel LUTs that every
+    update pushes the framebuffer through in one pass, with any nonzero input kept
+    at 1 or more so dark colors don't vanish at low brightness. The LUTs are only
+    rebuilt when a setting changes, and when they are the identity the framebuffer
+    isn't touched at all.
+
+    The same pass sums the driver duty of the output, which gives a current
+    estimate for the frame. If that goes over power_budget_ma the LUTs are scaled
+    down and the frame redone before it is shown, and eased back up when there is
+    headroom again. Set the budget to 0 to turn the limiter off.
+    """
+
+    def __init__(self, cu, graphics, brightness=DEFAULT_BRIGHTNESS, gamma=DEFAULT_GAMMA, balance=(1.0, 1.0, 1.0),
+                 power_budget_ma=DEFAULT_POWER_BUDGET_MA):
+        self.cu = cu
+        self.graphics = graphics
+        self.framebuffer = memoryview(graphics)
+        self.linear = bytearray(len(self.framebuffer))
+        self.lut = bytearray(1024)  # red, green, blue, duty
+        for i in range(256):
+            self.lut[768 + i] = int(255 * (i / 255) ** DRIVER_GAMMA + 0.5)
+        self.curve = array("f", [0.0] * 256)  # (i / 255) ** gamma, only redone when gamma changes
+        self.identity = True
+
+        self.brightness = brightness
+        self.gamma = gamma
+        self.balance = balance  # Per-channel scale, for white balance
+
+        self.auto_dim = False
+        self.dim = 1.0
+        self.last_light_check = time.ticks_ms()
+
+        self.power_budget_ma = power_budget_ma
+        self.power_limit = 1.0  # Scale the limiter applies on top of brightness
+        self.power_ma = POWER_IDLE_MA  # Estimate for the last frame shown
+        self.peak_ma = 0  # Highest estimate since the last stats read
+        self.power_full = len(self.framebuffer) // BYTES_PER_PIXEL * 3 * 255
+
+        # Brightness is done in the LUT, the driver runs flat out. Whatever is on the
+        # panel now keeps the level it was shown at until the next update.
+        cu.set_brightness(1.0)
+        self.build_curve()
+        self.build_lut()
+
+    def effective_brightness(self):
+        return self.brightness * self.dim * self.power_limit
+
+    def build_curve(self):
+        curve = self.curve
+        gamma = self.gamma
+        for i in range(256):
+            curve[i] = (i / 255.0) ** gamma
+
+    def build_lut(self):
+        lut = self.lut
+        curve = self.curve
+        level = self.effective_brightness()
+        identity = level == 1.0 and self.gamma == 1.0
+        for c in range(3):
+            scale = 255.0 * level * self.balance[c]
+            identity = identity and self.balance[c] == 1.0
+            base = c * 256
+            lut[base] = 0
+            for i in range(1, 256):
+                v = int(scale * curve[i] + 0.5)
+                # Keep dark colors from vanishing at low brightness
+                if v < 1 and scale > 0:
+                    v = 1
+                lut[base + i] = min(v, 255)
+        self.identity = identity
+
+    def set_brightness(self, brightness):
+        self.brightness = max(0.0, min(1.0, brightness))
+        self.build_lut()
+
+    def set_gamma(self, gamma):
+        self.gamma = max(0.5, min(4.0, gamma))
+        self.build_curve()
+        self.build_lut()
+
+    def set_auto_dim(self, enabled):
+        self.auto_dim = enabled
+        if not enabled:
+            self.dim = 1.0
+            self.build_lut()
+        else:
+            self.last_light_check = time.ticks_add(time.ticks_ms(), -AUTO_DIM_INTERVAL_MS)
+
+    def check_light(self):
+        """Follow the ambient light every few seconds, only rebuilding the LUT on a real change"""
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.last_light_check) < AUTO_DIM_INTERVAL_MS:
+            return
+        self.last_light_check = now
+        light = min(self.cu.light(), AUTO_DIM_FULL_LIGHT) / AUTO_DIM_FULL_LIGHT
+        target = AUTO_DIM_MIN + (1.0 - AUTO_DIM_MIN) * light
+        # Move halfway each check so a passing shadow doesn't pump the brightness
+        dim = (self.dim + target) / 2
+        if abs(dim - self.dim) >= 0.02:
+            self.dim = dim
+            self.build_lut()
+
+    def estimate_ma(self, duty):
+        return POWER_IDLE_MA + int(POWER_FULL_MA * duty / self.power_full)
+
+    def set_power_budget(self, budget_ma):
+        """Budget in mA, 0 turns the limiter off. Has to be above what the board draws with the panel dark."""
+        if budget_ma != 0 and budget_ma <= POWER_IDLE_MA:
+            raise ValueError("power budget must be above " + str(POWER_IDLE_MA) + " mA")
+        self.power_budget_ma = budget_ma
+        # Start from full again, the next frame brings it down if needed
+        if self.power_limit != 1.0:
+            self.power_limit = 1.0
+            self.build_lut()
+
+    def limit_power(self, ma):
+        """
+        Pick a new power_limit from this frame's estimate. Returns True if it went down,
+        in which case the frame has to be redone with the new LUTs before it is shown.
+        """
+        budget = self.power_budget_ma
+        if ma <= POWER_IDLE_MA:
+            target = 1.0
+        else:
+            # Duty goes with the LUT scale ** DRIVER_GAMMA
+            target = min(1.0, self.power_limit * ((budget - POWER_IDLE_MA) / (ma - POWER_IDLE_MA)) ** (1 / DRIVER_GAMMA))
+        if ma > budget:
+            self.power_limit = target * POWER_MARGIN
+            self.build_lut()
+            return True
+        if self.power_limit < 1.0 and (target >= 1.0 or target >= self.power_limit * POWER_STEP):
+            self.power_limit = min(1.0, target * POWER_MARGIN) if target < 1.0 else 1.0
+            self.build_lut()
+        return False
+
+    def update(self, graphics=None):
+        if self.auto_dim:
+            self.check_light()
+        fb = self.framebuffer
+        linear = self.linear
+        lut = self.lut
+        mapped = not self.identity
+        if mapped:
+            linear[:] = fb
+            ma = self.estimate_ma(apply_lut(fb, lut, len(fb)))
+        else:
+            ma = self.estimate_ma(frame_duty(fb, lut, len(fb)))
+        if self.power_budget_ma and self.limit_power(ma):
+            # Over budget, redo the frame from the linear pixels with the lowered LUTs
+            if mapped:
+                fb[:] = linear
+            else:
+                linear[:] = fb
+                mapped = True
+            ma = self.estimate_ma(apply_lut(fb, lut, len(fb)))
+        self.power_ma = ma
+        if ma > self.peak_ma:
+            self.peak_ma = ma
+        self.cu.update(self.graphics)
+        if mapped:
+            fb[:] = linear
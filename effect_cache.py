@@ -0,0 +1,279 @@
+import gc
+from array import array
+import micropython
+
+# Every KEYFRAME_INTERVAL frames is stored whole so playback can jump in anywhere
+KEYFRAME_INTERVAL = 16
+# How a frame is stored
+FRAME_FULL = 0  # Every pixel of the region
+FRAME_DELTA = 1  # Only the pixels that changed, as 2-byte index + color
+FRAME_INDEXED = 2  # Every pixel as a 1-byte index into the frame's own RGB565 palette
+MAX_PALETTE = 256
+# Rainbow, the biggest built-in, takes 58,320 bytes: every pixel changes every frame and
+# most frames have over 256 colors, so neither deltas nor indexed frames help it
+DEFAULT_MAX_BYTES = 64 * 1024
+DEFAULT_MIN_FREE = 24 * 1024  # Leave at least this much heap for everything else
+
+
+@micropython.viper
+def _apply_565(fb: ptr8, offsets: ptr16, data: ptr8, packed: int):
+    """Write count RGB565 pixels (or delta records) from data into the RGB888 framebuffer, packed = count << 1 | delta"""
+    count = packed >> 1
+    delta = packed & 1
+    i = 0
+    p = 0
+    while i < count:
+        if delta:
+            idx = data[p] | (data[p + 1] << 8)
+            p += 2
+        else:
+            idx = i
+        c = data[p] | (data[p + 1] << 8)
+        p += 2
+        o = offsets[idx]
+        r = (c >> 11) & 31
+        g = (c >> 5) & 63
+        b = c & 31
+        fb[o + 2] = (r << 3) | (r >> 2)
+        fb[o + 1] = (g << 2) | (g >> 4)
+        fb[o] = (b << 3) | (b >> 2)
+        i += 1
+
+
+@micropython.viper
+def _apply_888(fb: ptr8, offsets: ptr16, data: ptr8, packed: int):
+    """Write count RGB888 pixels (or delta records) from data into the RGB888 framebuffer, packed = count << 1 | delta"""
+    count = packed >> 1
+    delta = packed & 1
+    i = 0
+    p = 0
+    while i < count:
+        if delta:
+            idx = data[p] | (data[p + 1] << 8)
+            p += 2
+        else:
+            idx = i
+        o = offsets[idx]
+        fb[o + 2] = data[p]
+        fb[o + 1] = data[p + 1]
+        fb[o] = data[p + 2]
+        p += 3
+        i += 1
+
+
+
+@micropython.viper
+def _apply_indexed(fb: ptr8, offsets: ptr16, data: ptr8, count: int):
+    """Write count palette-indexed pixels into the RGB888 framebuffer, the RGB565 palette follows the indices in data"""
+    i = 0
+    while i < count:
+        p = count + (data[i] << 1)
+        c = data[p] | (data[p + 1] << 8)
+        o = offsets[i]
+        r = (c >> 11) & 31
+        g = (c >> 5) & 63
+        b = c & 31
+        fb[o + 2] = (r << 3) | (r >> 2)
+        fb[o + 1] = (g << 2) | (g >> 4)
+        fb[o] = (b << 3) | (b >> 2)
+        i += 1
+
+class EffectCache:
+    """
+    Records one full period of a looping effect as it is drawn live, then plays
+    it back instead of running the effect's math.
+
+    Only the pixels in the region (framebuffer byte offsets) are stored. With
+    reduced=True colors are kept as RGB565, 2 bytes a pixel. Each frame is stored
+    in whichever form is smallest: whole, as the pixels that changed since the
+    previous frame, or (reduced only) as 1-byte indices into a palette of the
+    frame's own colors when it has few enough. A whole or indexed keyframe comes
+    every KEYFRAME_INTERVAL frames. Effects where every pixel changes every frame
+    in lots of colors, like rainbow, get nothing from either and take the full
+    size, about len(region) * 2 * period bytes. Only one effect is cached at a
+    time. If the recording would go over max_bytes, or the heap gets low, the
+    cache is dropped and that effect stays live-rendered. A finished cache is
+    dropped too if the heap gets low while it is playing.
+    """
+
+    def __init__(self, framebuffer, region_offsets, reduced=True,
+                 max_bytes=DEFAULT_MAX_BYTES, min_free=DEFAULT_MIN_FREE):
+        self.fb = framebuffer
+        self.offsets = array("H", region_offsets)
+        self.reduced = reduced
+        self.bpp = 2 if reduced else 3
+        self.max_bytes = max_bytes
+        self.min_free = min_free
+        self.uncacheable = set()
+        self.frames = []
+        self.evict()
+
+    def evict(self):
+        """Drop whatever is cached"""
+        # Only worth a collection if there was something to drop, not at boot
+        dropped = bool(self.frames)
+        self.name = None
+        self.period = 0
+        self.frames = []
+        self.size = 0
+        self.complete = False
+        self.next_index = 0
+        self.last_index = -1
+        self.previous = None
+        if dropped:
+            gc.collect()
+
+    def give_up(self, reason):
+        print("[CACHE] not caching", self.name, "-", reason)
+        self.uncacheable.add(self.name)
+        self.evict()
+
+    def play(self, name, phase):
+        """Draw the cached frame for this phase. Returns False if the caller has to render live."""
+        if name != self.name or not self.complete:
+            return False
+        if gc.mem_free() < self.min_free:
+            # Something else needs the heap now, a full-keyframe cache can be most of it
+            print("[CACHE] dropping", name, "- heap low")
+            self.evict()
+            return False
+        index = phase % self.period
+        if index != (self.last_index + 1) % self.period:
+            # Jumped, catch up from the keyframe at or before this frame
+            start = index - index % KEYFRAME_INTERVAL
+        else:
+            start = index
+        apply = _apply_565 if self.reduced else _apply_888
+        for i in range(start, index + 1):
+            kind, count, data = self.frames[i]
+            if kind == FRAME_INDEXED:
+                _apply_indexed(self.fb, self.offsets, data, count)
+            else:
+                # Viper functions take at most four arguments
+                apply(self.fb, self.offsets, data, (count << 1) | kind)
+        self.last_index = index
+        return True
+
+    def record(self, name, phase, period):
+        """Capture the frame the effect just drew live for this phase"""
+        if name in self.uncacheable:
+            return
+        if name != self.name:
+            self.evict()
+            self.name = name
+            self.period = period
+        if self.complete:
+            return
+        index = phase % period
+        if index != self.next_index:
+            # Recording has to start at frame 0 and see every frame in order
+            self.frames = []
+            self.size = 0
+            self.previous = None
+            self.next_index = 0
+            if index != 0:
+                return
+
+        if gc.mem_free() < self.min_free:
+            self.give_up("heap low")
+            return
+
+        current = self.capture()
+        count = len(self.offsets)
+        kind = FRAME_FULL
+        data = current
+        if self.reduced:
+            indexed = self.index(current)
+            if indexed is not None:
+                kind = FRAME_INDEXED
+                data = indexed
+        if index % KEYFRAME_INTERVAL != 0 and self.previous is not None:
+            delta, changed = self.diff(self.previous, current)
+            if delta is not None and len(delta) < len(data):
+                kind = FRAME_DELTA
+                data = delta
+                count = changed
+        self.frames.append((kind, count, data))
+        self.previous = current
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.give_up(f"over {self.max_bytes} bytes")
+            return
+
+        self.next_index = index + 1
+        if self.next_index == period:
+            self.complete = True
+            self.previous = None
+            self.last_index = index
+            print("[CACHE]", name, "cached,", period, "frames in", self.size, "bytes")
+
+    def capture(self):
+        """Copy the region out of the framebuffer, quantized to the stored precision and written back"""
+        fb = self.fb
+        bpp = self.bpp
+        out = bytearray(len(self.offsets) * bpp)
+        p = 0
+        for o in self.offsets:
+            r = fb[o + 2]
+            g = fb[o + 1]
+            b = fb[o]
+            if self.reduced:
+                c = ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
+                out[p] = c & 0xFF
+                out[p + 1] = c >> 8
+                # Live frames should look exactly like the replayed ones
+                r = (r & 0xF8) | (r >> 5)
+                g = (g & 0xFC) | (g >> 6)
+                b = (b & 0xF8) | (b >> 5)
+                fb[o + 2] = r
+                fb[o + 1] = g
+                fb[o] = b
+            else:
+                out[p] = r
+                out[p + 1] = g
+                out[p + 2] = b
+            p += bpp
+        return out
+
+    def index(self, current):
+        """The frame as 1-byte palette indices followed by its RGB565 palette, or None if that isn't smaller"""
+        count = len(self.offsets)
+        palette = {}
+        indices = bytearray(count)
+        for i in range(count):
+            c = current[2 * i] | (current[2 * i + 1] << 8)
+            n = palette.get(c)
+            if n is None:
+                n = len(palette)
+                if n >= MAX_PALETTE or count + 2 * (n + 1) >= len(current):
+                    return None
+                palette[c] = n
+            indices[i] = n
+        out = bytearray(count + 2 * len(palette))
+        out[:count] = indices
+        for c, n in palette.items():
+            out[count + 2 * n] = c & 0xFF
+            out[count + 2 * n + 1] = c >> 8
+        return out
+
+    def diff(self, previous, current):
+        """Delta records (2-byte index + color) for changed pixels, or (None, 0) if a full frame is smaller"""
+        bpp = self.bpp
+        record = 2 + bpp
+        limit = len(current) // record
+        changed = []
+        for i in range(len(self.offsets)):
+            p = i * bpp
+            if current[p:p + bpp] != previous[p:p + bpp]:
+                changed.append(i)
+                if len(changed) >= limit:
+                    return None, 0
+        out = bytearray(len(changed) * record)
+        q = 0
+        for i in changed:
+            p = i * bpp
+            out[q] = i & 0xFF
+            out[q + 1] = i >> 8
+            out[q + 2:q + record] = current[p:p + bpp]
+            q += record
+        return out, len(changed)
@@ -0,0 +1,128 @@
+"""
+Ambient effect plugins.
+
+Every other module in this package is an effect, named after its file. It
+defines an Effect class:
+
+    class Effect:
+        REGIONS = REGION_RED  # Which parts of the mask it draws, REGION_RED | REGION_WHITE for both
+        PERIOD = 0            # Frames until it repeats exactly, > 0 lets it be cached and replayed.
+                              # Has to divide animations.PHASE_WRAP (9000), otherwise it runs live
+
+        def __init__(self, geometry):
+            ...
+
+        def render(self, phase, buf):
+            # Write r, g, b for cell i to buf[i * 3:i * 3 + 3]
+            ...
+
+Drop a file in here and its name works as a command, nothing else needs
+editing. The white outline is put back when an effect that drew on it ends. Modules are only imported the first time their effect is picked.
+"""
+import math
+import os
+import sys
+from array import array
+
+from display import WIDTH, HEIGHT
+
+REGION_RED = 1
+REGION_WHITE = 2
+
+# dist is in 1/DIST_SCALE pixels, angle is 0-255 for a full turn
+DIST_SCALE = 8
+CENTER_X = (WIDTH - 1) / 2
+CENTER_Y = (HEIGHT - 1) / 2
+
+# One turn of a sine wave in 256 steps, 0-255, for integer-only effects
+SIN8 = bytes(int(127.5 + 127.5 * math.sin(i * 2 * math.pi / 256)) for i in range(256))
+
+
+class Geometry:
+    """
+    Per-cell tables for the pixels an effect draws, built once and shared by
+    every effect that draws the same regions. Index i in each table is the
+    cell whose color goes to buf[i * 3:i * 3 + 3].
+    """
+
+    def __init__(self, mask_red, mask_white, regions):
+        flags = {}
+        if regions & REGION_RED:
+            for p in mask_red:
+                flags[p] = REGION_RED
+        if regions & REGION_WHITE:
+            for p in mask_white:
+                flags[p] = flags.get(p, 0) | REGION_WHITE
+        points = sorted(flags, key=lambda p: (p[1], p[0]))
+        count = len(points)
+        self.count = count
+        self.x = bytearray(count)
+        self.y = bytearray(count)
+        self.dist = bytearray(count)
+        self.angle = bytearray(count)
+        self.region = bytearray(count)
+        # Framebuffer byte offsets, for the blit
+        self.offsets = array("H", [0] * count)
+        for i in range(count):
+            x, y = points[i]
+            dx = x - CENTER_X
+            dy = y - CENTER_Y
+            self.x[i] = x
+            self.y[i] = y
+            self.dist[i] = min(255, int(math.sqrt(dx * dx + dy * dy) * DIST_SCALE))
+            self.angle[i] = int(math.atan2(dy, dx) * 128 / math.pi) & 255
+            self.region[i] = flags[points[i]]
+            self.offsets[i] = (y * WIDTH + x) * 4
+
+
+def package_dir():
+    try:
+        return __file__.rsplit("/", 1)[0]
+    except NameError:
+        return __name__  # No __file__ when frozen into the firmware
+
+
+def names():
+    """Effects available in the package, without importing them"""
+    found = []
+    for entry in os.listdir(package_dir()):
+        if entry.endswith(".py"):
+            name = entry[:-3]
+        elif entry.endswith(".mpy"):
+            name = entry[:-4]
+        else:
+            continue
+        if not name.startswith("_") and name not in found:
+            found.append(name)
+    found.sort()
+    return found
+
+
+class Registry:
+    """Looks effects up by name and keeps one Geometry per region set"""
+
+    def __init__(self, mask_red, mask_white):
+        self.mask_red = mask_red
+        self.mask_white = mask_white
+        self.available = names()
+        self.geometries = {}
+
+    def __contains__(self, name):
+        return name in self.available
+
+    def geometry(self, regions):
+        geometry = self.geometries.get(regions)
+        if geometry is None:
+            geometry = Geometry(self.mask_red, self.mask_white, regions)
+            self.geometries[regions] = geometry
+        return geometry
+
+    def create(self, name):
+        """Import the effect and set it up with its geometry"""
+        if name not in self.available:
+            raise KeyError(name)
+        module_name = __name__ + "." + name
+        __import__(module_name)
+        effect_class = sys.modules[module_name].Effect
+        geometry = self.geometry(getattr(effect_class, "REGIONS", REGION_RED))
+        return effect_class(geometry), geometry
@@ -0,0 +1,34 @@
+from effects import REGION_RED
+
+# Length of the fading trail behind the beam, out of 256 for a full turn
+TRAIL = 96
+BEAM = (40, 255, 60)
+BACKGROUND = (0, 24, 0)
+
+
+class Effect:
+    """A radar beam sweeping round the face with a fading trail"""
+    REGIONS = REGION_RED
+    PERIOD = 60  # Divides PHASE_WRAP
+
+    def __init__(self, geometry):
+        self.geometry = geometry
+
+    def render(self, phase, buf):
+        sweep = (phase * 256 // self.PERIOD) & 255
+        angle = self.geometry.angle
+        r0, g0, b0 = BACKGROUND
+        r1, g1, b1 = BEAM
+        p = 0
+        for i in range(self.geometry.count):
+            behind = (sweep - angle[i]) & 255
+            if behind < TRAIL:
+                v = 255 - behind * 255 // TRAIL
+                buf[p] = r0 + ((r1 - r0) * v >> 8)
+                buf[p + 1] = g0 + ((g1 - g0) * v >> 8)
+                buf[p + 2] = b0 + ((b1 - b0) * v >> 8)
+            else:
+                buf[p] = r0
+                buf[p + 1] = g0
+                buf[p + 2] = b0
+            p += 3
@@ -0,0 +1,31 @@
+from effects import REGION_RED, SIN8
+
+# Rings per pixel of distance (out of 256 steps per ring, dist is in 1/8 px), and colors
+RING_STEP = 12
+HUE_A = (0, 80, 255)
+HUE_B = (0, 255, 160)
+
+
+class Effect:
+    """Rings of color running out from the middle of the face"""
+    REGIONS = REGION_RED
+    PERIOD = 60  # Divides PHASE_WRAP
+
+    def __init__(self, geometry):
+        self.geometry = geometry
+        # Ring brightness only depends on distance, work it out once
+        self.base = bytes((d * RING_STEP) & 255 for d in geometry.dist)
+
+    def render(self, phase, buf):
+        shift = (phase * 256 // self.PERIOD) & 255
+        base = self.base
+        ar, ag, ab = HUE_A
+        br, bg, bb = HUE_B
+        p = 0
+        for i in range(self.geometry.count):
+            v = SIN8[(base[i] - shift) & 255]
+            w = 255 - v
+            buf[p] = (ar * v + br * w) >> 8
+            buf[p + 1] = (ag * v + bg * w) >> 8
+            buf[p + 2] = (ab * v + bb * w) >> 8
+            p += 3
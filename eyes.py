@@ -0,0 +1,141 @@
+import random
+import time
+
+# What each eye pixel shows
+SCLERA = 0
+PUPIL = 1
+LID = 2
+
+# Eyes are 2x2, sprites list the pixels as top-left, top-right, bottom-left, bottom-right
+GAZES = (
+    (0, 0, 0, 0),  # open, no pupil - how the artwork looks
+    (1, 0, 1, 0),  # left
+    (0, 1, 0, 1),  # right
+    (1, 1, 0, 0),  # up
+    (0, 0, 1, 1),  # down
+    (1, 0, 0, 0),  # up-left
+    (0, 1, 0, 0),  # up-right
+    (0, 0, 1, 0),  # down-left
+    (0, 0, 0, 1),  # down-right
+)
+GAZE_OPEN = 0
+
+LID_OPEN = 0
+LID_HALF = 1
+LID_CLOSED = 2
+LIDS = (
+    (None, None, None, None),
+    (LID, LID, None, None),
+    (LID, LID, LID, LID),
+)
+
+# Blink: (lid, how long it's held in ms)
+BLINK = ((LID_HALF, 50), (LID_CLOSED, 90), (LID_HALF, 50))
+
+# Random gaps between blinks and between saccades in ms, (calm, crazy)
+BLINK_INTERVAL = ((1500, 5000), (700, 2500))
+SACCADE_INTERVAL = (120, 450)
+
+
+def build_atlas():
+    """Every gaze with every lid state, as 4-byte sprites: atlas[gaze * len(LIDS) + lid]"""
+    atlas = []
+    for gaze in GAZES:
+        for lid in LIDS:
+            atlas.append(bytes(lid[i] if lid[i] is not None else gaze[i] for i in range(4)))
+    return atlas
+
+
+ATLAS = build_atlas()
+
+
+class EyeEngine:
+    """
+    Blinking and darting eyes for the two 2x2 eye regions.
+    Blinks and saccades are scheduled at random times against ticks_ms, and
+    only pixels whose sprite value changed since the last draw are redrawn, so
+    most frames touch no pixels at all.
+    """
+
+    def __init__(self, graphics, left_region, right_region):
+        self.graphics = graphics
+        self.regions = (left_region, right_region)
+        self.sclera_pen = graphics.create_pen(255, 255, 255)
+        self.pupil_pen = graphics.create_pen(0, 0, 0)
+        self.lid_color = None
+        self.lid_pen = None
+        self.gaze = [GAZE_OPEN, GAZE_OPEN]
+        self.shown = bytearray(8)  # Sprite value on screen per eye pixel, 0xFF = unknown
+        self.crazy = False
+        now = time.ticks_ms()
+        self.blink_step = -1
+        self.step_until = now
+        self.next_blink = time.ticks_add(now, random.randint(*BLINK_INTERVAL[0]))
+        self.next_saccade = now
+        self.invalidate()
+
+    def invalidate(self):
+        """Something else drew over the eyes, redraw them fully next time"""
+        for i in range(8):
+            self.shown[i] = 0xFF
+
+    def reset(self):
+        """Put both eyes back to plain open whites, as in the artwork, before another mode takes over"""
+        self.gaze[0] = self.gaze[1] = GAZE_OPEN
+        self.blink_step = -1
+        self.next_blink = time.ticks_add(time.ticks_ms(), random.randint(*BLINK_INTERVAL[self.crazy]))
+        self.invalidate()
+        return self.draw(LID_OPEN)
+
+    def update(self, crazy, lid_color):
+        """Advance blinks/saccades and draw what changed. Returns True if any pixel was drawn."""
+        now = time.ticks_ms()
+        if lid_color != self.lid_color:
+            self.lid_color = lid_color
+            self.lid_pen = self.graphics.create_pen(*lid_color)
+            self.invalidate()
+        if crazy != self.crazy:
+            self.crazy = crazy
+            self.next_blink = time.ticks_add(now, random.randint(*BLINK_INTERVAL[crazy]))
+            if not crazy:
+                self.gaze[0] = self.gaze[1] = GAZE_OPEN
+
+        # Blinking
+        if self.blink_step < 0:
+            if time.ticks_diff(now, self.next_blink) >= 0:
+                self.blink_step = 0
+                self.step_until = time.ticks_add(now, BLINK[0][1])
+        elif time.ticks_diff(now, self.step_until) >= 0:
+            self.blink_step += 1
+            if self.blink_step >= len(BLINK):
+                self.blink_step = -1
+                self.next_blink = time.ticks_add(now, random.randint(*BLINK_INTERVAL[crazy]))
+            else:
+                self.step_until = time.ticks_add(now, BLINK[self.blink_step][1])
+        lid = BLINK[self.blink_step][0] if self.blink_step >= 0 else LID_OPEN
+
+        # Saccades - each eye off on its own
+        if crazy and time.ticks_diff(now, self.next_saccade) >= 0:
+            self.gaze[0] = random.randint(1, len(GAZES) - 1)
+            self.gaze[1] = random.randint(1, len(GAZES) - 1)
+            self.next_saccade = time.ticks_add(now, random.randint(*SACCADE_INTERVAL))
+
+        return self.draw(lid)
+
+    def draw(self, lid):
+        graphics = self.graphics
+        shown = self.shown
+        pens = (self.sclera_pen, self.pupil_pen, self.lid_pen)
+        changed = False
+        for eye in range(2):
+            sprite = ATLAS[self.gaze[eye] * len(LIDS) + lid]
+            region = self.regions[eye]
+            for i in range(4):
+                value = sprite[i]
+                if shown[eye * 4 + i] != value:
+                    shown[eye * 4 + i] = value
+                    graphics.set_pen(pens[value])
+                    x, y = region[i]
+                    graphics.pixel(x, y)
+                    changed = True
+        return changed
@@ -0,0 +1,116 @@
+import random
+from array import array
+import micropython
+
+from display import WIDTH, HEIGHT
+
+# Cooling per cell per frame is 0..COOLING_MAX, from a random map that scrolls with the flames
+COOLING_MAX = 16
+# Chance out of 256 that a cell on the spark row flares up each frame
+SPARK_CHANCE = 48
+# Lowest palette entry, so the mask never goes fully dark between flames
+EMBER = (70, 0, 0)
+
+
+@micropython.viper
+def _fire_step(heat: ptr8, cooling: ptr8, offset: int):
+    """Every cell but the bottom two rows takes the average of the three cells below and the one two below, minus cooling"""
+    y = 0
+    while y < 30:  # HEIGHT - 2
+        row = y << 5  # * WIDTH
+        x = 0
+        while x < 32:
+            below = row + 32 + x
+            if x > 0:
+                left = below - 1
+            else:
+                left = below
+            if x < 31:
+                right = below + 1
+            else:
+                right = below
+            v = (heat[left] + heat[below] + heat[right] + heat[below + 32]) >> 2
+            c = cooling[(row + x + offset) & 1023]
+            if v > c:
+                heat[row + x] = v - c
+            else:
+                heat[row + x] = 0
+            x += 1
+        y += 1
+
+
+@micropython.viper
+def _fire_render(fb: ptr8, heat: ptr8, palette: ptr8, cells: ptr16):
+    """Map heat through the palette for each cell in cells, which ends with 0xFFFF"""
+    i = 0
+    while True:
+        cell = cells[i]
+        if cell == 0xFFFF:
+            break
+        p = heat[cell] * 3
+        o = cell << 2
+        fb[o + 2] = palette[p]
+        fb[o + 1] = palette[p + 1]
+        fb[o] = palette[p + 2]
+        i += 1
+
+
+def build_palette():
+    """256 fire colors: embers, red, orange, yellow, white-hot, as r, g, b bytes"""
+    palette = bytearray(768)
+    er, eg, eb = EMBER
+    for t in range(256):
+        if t < 96:
+            r = er + (255 - er) * t // 96
+            g = eg
+            b = eb
+        elif t < 192:
+            r = 255
+            g = 180 * (t - 96) // 96
+            b = 0
+        else:
+            r = 255
+            g = 180 + 75 * (t - 192) // 64
+            b = 120 * (t - 192) // 64
+        palette[t * 3] = r
+        palette[t * 3 + 1] = g
+        palette[t * 3 + 2] = b
+    return palette
+
+
+class FireEngine:
+    """
+    Heat-field fire: the whole panel is simulated in a bytearray so flames can
+    rise through gaps in the mask, but only the cells listed in the mask are drawn.
+    Each frame the bottom rows get fresh heat and sparks, and everything above
+    takes the average of the cells below it minus a little cooling.
+    All integer work, no floats per pixel.
+    """
+
+    def __init__(self, mask):
+        self.heat = bytearray(WIDTH * HEIGHT)
+        self.cooling = bytearray(random.getrandbits(8) * (COOLING_MAX + 1) >> 8 for _ in range(WIDTH * HEIGHT))
+        self.offset = 0
+        self.palette = build_palette()
+        # Pixel indices of the mask, 0xFFFF marks the end for the render loop
+        self.cells = array("H", sorted(y * WIDTH + x for x, y in mask))
+        self.cells.append(0xFFFF)
+
+    def step(self):
+        heat = self.heat
+        getrandbits = random.getrandbits
+        base = (HEIGHT - 1) * WIDTH
+        sparks = (HEIGHT - 2) * WIDTH
+        for x in range(WIDTH):
+            # Bottom row is the fuel bed, the one above it flares randomly
+            heat[base + x] = 160 + (getrandbits(8) * 95 >> 8)
+            if getrandbits(8) < SPARK_CHANCE:
+                heat[sparks + x] = 255
+            else:
+                heat[sparks + x] = (heat[base + x] + heat[sparks + x]) >> 1
+        # Move the cooling pattern up with the flames so it doesn't look like a fixed mesh
+        self.offset = (self.offset + WIDTH) & (WIDTH * HEIGHT - 1)
+        _fire_step(heat, self.cooling, self.offset)
+
+    def render(self, framebuffer):
+        _fire_render(framebuffer, self.heat, self.palette, self.cells)
@@ -1,4 +1,3 @@
-import network
 import socket
 import time
 import math
@@ -6,64 +5,104 @@ from cosmic import CosmicUnicorn
 from picographics import PicoGraphics, DISPLAY_COSMIC_UNICORN
 from makey_arrays import mask_red, mask_white, base_image
 from animations import AnimationManager
-from laugh import animation_frames as laugh_frames  # Ensure laugh.py is imported
+from display import Display
+from connect_wifi import WifiManager
+from controller import Controller
+from command_log import CommandRecorder
+import render_worker
+from render_worker import RenderWorker
 
 
 
 SSID = "RJB_PUK_2.4"
 PASSWORD = "pimoroni"
 
+BRIGHTNESS = 0.5
+
 cu = CosmicUnicorn()
 graphics = PicoGraphics(display=DISPLAY_COSMIC_UNICORN)
-cu.set_brightness(0.5)
 
 # Initialize animation manager
 anim_manager = AnimationManager(graphics, mask_red, mask_white, base_image)
 
-# Modes
-MODE_RED = 0
-MODE_RAINBOW = 1
-MODE_STATIC = 2
-MODE_FIRE = 3
-MODE_EYES_MOVING = 4
-MODE_EYES_BLINKING = 5
-MODE_EYES_CRAZY = 6
-mode = MODE_RED
-
 # Add frame index for discrete eyes moving
 frame_index_eyes_moving = 0
 TOTAL_EYES_FRAMES = 10  # Number of steps to move left (adjust as needed)
 
-# Connect to WiFi
-wlan = network.WLAN(network.STA_IF)
-wlan.active(True)
-wlan.connect(SSID, PASSWORD)
-print("Connecting to WiFi...")
-while not wlan.isconnected():
-    time.sleep(0.5)
-print("Connected:", wlan.ifconfig())
-
-# Setup TCP server
-addr = socket.getaddrinfo('0.0.0.0', 5000)[0][-1]
-s = socket.socket()
-s.bind(addr)
-s.listen(1)
-s.setblocking(False)
-print("Socket server listening on", addr)
-print("Available commands: red, rainbow, static, fire, eyes_moving, eyes_blinking, eyes_crazy")
-
-frame_delay = 33  # ~30 FPS
-last_draw_time = time.ticks_ms()
-
-# Draw initial red pixels on startup
+# Draw initial red pixels on startup, before any network bring-up. This one frame goes
+# straight to the driver, the Display and Controller are set up after it.
 anim_manager.draw_red()
+cu.set_brightness(BRIGHTNESS)
 cu.update(graphics)
 
-while True:
+# ticks_ms() counts from power-on, so this is the time to first frame
+boot_first_frame_ms = time.ticks_ms()
+print("[BOOT] First frame after", boot_first_frame_ms, "ms")
+
+# Brightness and gamma are applied by the Display on every update from here on, it puts
+# the driver at full brightness for the next frame
+display = Display(cu, graphics, brightness=BRIGHTNESS)
+controller = Controller(display, graphics, anim_manager)
+controller.boot_ms = boot_first_frame_ms
+
+from laugh import animation_frames as laugh_frames  # Ensure laugh.py is imported
+
+# Setup TCP server - (re)bound by the Wi-Fi manager every time the link comes up
+s = None
+
+def open_server(wlan):
+    global s
+    close_server()
+    addr = socket.getaddrinfo('0.0.0.0', 5000)[0][-1]
+    s = socket.socket()
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    s.bind(addr)
+    s.listen(1)
+    s.setblocking(False)
+    print("Socket server listening on", addr)
+    print("Available commands:", controller.commands_help())
+
+def close_server():
+    global s
+    if s:
+        try:
+            s.close()
+        except:
+            pass
+        s = None
+
+# Connect to WiFi in the background, rendering never waits on it
+wifi = WifiManager(SSID, PASSWORD, on_connect=open_server, on_disconnect=close_server)
+
+# Every command goes to flash so a show can be replayed later
+recorder = CommandRecorder()
+
+# Rendering runs on core 1; this core only does Wi-Fi, the socket and parsing
+worker = None
+if render_worker.RENDER_ON_CORE1:
+    worker = RenderWorker(controller)
+    worker.start()
+pending = []  # (client, request, deadline) waiting for the render core to run the command
+# Longer than the longest one-shot animation plus a queue of them
+PENDING_TIMEOUT_MS = 30000
+
+def reply(cl, response):
     try:
-        cl, addr = s.accept()
-    except:
-        cl = None
+        cl.send((response + "\n").encode())
+    except Exception as e:
+        print("Client error:", e)
+    finally:
+        cl.close()
+
+while True:
+    wifi.poll()
+
+    cl = None
+    if s:
+        try:
+            cl, addr = s.accept()
+        except:
+            cl = None
 
     if cl:
         print("Client connected from", addr)
@@ -72,122 +111,17 @@ while True:
             cl.settimeout(5.0)  # 5 second timeout
             cmd = cl.recv(1024).decode().strip().lower()
             print("Received command:", cmd)
-            
-            if cmd in ["red", "blue", "green", "purple", "pink"]:
-                mode = MODE_RED
-                anim_manager.set_mask_color(cmd)
-                anim_manager.draw_mask_color()
-                cu.update(graphics)
-                response = f"OK: {cmd.upper()} mode"
-            elif cmd == "rainbow":
-                mode = MODE_RAINBOW
-                response = "OK: RAINBOW mode 🌈"
-            elif cmd == "static":
-                mode = MODE_STATIC
-                anim_manager.draw_static()
-                cu.update(graphics)
-                response = "OK: STATIC mode"
-            elif cmd == "fire":
-                mode = MODE_FIRE
-                response = "OK: FIRE mode 🔥"
-            elif cmd == "eyes_moving":
-                mode = MODE_EYES_MOVING
-                response = "OK: EYES MOVING mode 👀"
-                # Run the eyes animation loop twice, then stop
-                for _ in range(2 * len(anim_manager.eyes_move.animation_frames)):
-                    anim_manager.draw_eyes_moving()
-                    cu.update(graphics)
-                    time.sleep(frame_delay / 1000.0)
-                mode = MODE_STATIC
-            elif cmd == "eyes_blinking":
-                mode = MODE_EYES_BLINKING
-                response = "OK: EYES BLINKING mode 😉"
-            elif cmd == "eyes_crazy":
-                mode = MODE_EYES_CRAZY
-                response = "OK: EYES CRAZY mode 😵"
-            elif cmd == "laugh":
-                mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
-                response = "OK: LAUGH mode 😆"
-                from laugh import animation_frames
-                for i in range(2 * len(animation_frames)):
-                    anim_manager.draw_laugh()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(0.5)
-                mode = MODE_STATIC
-            elif cmd == "leftarm_up":
-                mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
-                response = "OK: leftarm_up mode 😆"
-                for i in range(1 * len(anim_manager.leftarm_up.animation_frames)):
-                    anim_manager.draw_leftarm_up()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(frame_delay / 1000.0)
-                mode = MODE_STATIC
-            elif cmd == "leftarm_down":
-                mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
-                response = "OK: leftarm_down mode 😆"
-                from leftarm_down import animation_frames
-                for i in range(1 * len(animation_frames)):
-                    anim_manager.draw_leftarm_down()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(frame_delay / 1000.0)
-                mode = MODE_STATIC
-            elif cmd == "rightarm_up":
-                mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
-                response = "OK: rightarm_up mode 😆"
-                from rightarm_up import animation_frames
-                for i in range(1 * len(animation_frames)):
-                    anim_manager.draw_rightarm_up()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(frame_delay / 1000.0)
-                mode = MODE_STATIC
-            elif cmd == "rightarm_down":
-                mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
-                response = "OK: rightarm_down mode 😆"
-                from rightarm_down import animation_frames
-                for i in range(1 * len(animation_frames)):
-                    anim_manager.draw_rightarm_down()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(frame_delay / 1000.0)
-                mode = MODE_STATIC
-            elif cmd == "dance_1":
-                mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
-                response = "OK: dance_1 mode 😆"
-                for i in range(1 * len(leftarm_up.animation_frames)):
-                    anim_manager.draw_leftarm_up()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(frame_delay / 1000.0)
-                for i in range(1 * len(leftarm_up.animation_frames)):
-                    anim_manager.draw_leftarm_down()
-                    anim_manager.draw_rightarm_up()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(frame_delay / 1000.0)
-                for i in range(1 * len(leftarm_up.animation_frames)):
-                    anim_manager.draw_leftarm_up()
-                    anim_manager.draw_rightarm_down()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(frame_delay / 1000.0)
-                mode = MODE_STATIC
-            elif cmd == "dance_2":
-                mode = MODE_STATIC  # Or a new MODE_LAUGH if you want
-                response = "OK: dance_1 mode 😆"
-                for i in range(1 * len(dance_1.animation_frames)):
-                    anim_manager.draw_dance_1()
-                    cu.update(graphics)
-                    # Add a longer delay after each frame
-                    time.sleep(frame_delay / 1000.0)
-                mode = MODE_STATIC
+            recorder.record_command(cmd)
+            if worker and cmd == "stats":
+                # Only reads counters, no need to queue behind a long animation. The reset is left to core 1.
+                cl.send((controller.stats(reset=False) + "\n").encode())
+                worker.reset_stats()
+            elif worker:
+                pending.append((cl, worker.submit(cmd), time.ticks_add(time.ticks_ms(), PENDING_TIMEOUT_MS)))
+                cl = None  # Answered once the render core has run it
             else:
-                response = f"ERROR: Unknown command '{cmd}'. Available: red, rainbow, static, fire, eyes_moving, eyes_blinking, eyes_crazy"
-            
-            cl.send((response + "\n").encode())
+                response = controller.handle_command(cmd)
+                cl.send((response + "\n").encode())
         except Exception as e:
             print("Client error:", e)
             try:
@@ -195,21 +129,25 @@ while True:
             except:
                 pass
         finally:
-            cl.close()
-
-    now = time.ticks_ms()
-    if (mode == MODE_RAINBOW or mode == MODE_FIRE or mode == MODE_EYES_MOVING or 
-        mode == MODE_EYES_BLINKING or mode == MODE_EYES_CRAZY) and time.ticks_diff(now, last_draw_time) >= frame_delay:
-        last_draw_time = now
-        if mode == MODE_RAINBOW:
-            anim_manager.update_rainbow_phase()
-            anim_manager.draw_rainbow()
-        elif mode == MODE_FIRE:
-            anim_manager.update_rainbow_phase()
-            anim_manager.draw_fire()
-        elif mode == MODE_EYES_BLINKING:
-            anim_manager.draw_eyes_blinking()
-        elif mode == MODE_EYES_CRAZY:
-            anim_manager.draw_eyes_crazy()
-        print("[MAIN DEBUG] Calling cu.update(graphics)")
-        cu.update(graphics)
+            if cl:
+                cl.close()
+
+    if worker:
+        if pending:
+            waiting = []
+            now = time.ticks_ms()
+            for client, request, deadline in pending:
+                response = request.response  # Read once, the render core may set it any time
+                if response is not None:
+                    reply(client, response)
+                elif time.ticks_diff(now, deadline) >= 0:
+                    request.cancelled = True
+                    reply(client, "ERROR: timed out waiting for the render core")
+                else:
+                    waiting.append((client, request, deadline))
+            pending = waiting
+        worker.set_offline(wifi.offline())
+        time.sleep_ms(1)
+    else:
+        controller.set_offline(wifi.offline())
+        controller.tick()
@@ -0,0 +1,130 @@
+import _thread
+import time
+
+# main.py renders on the second core when this is set; the simulator can turn it off to compare
+RENDER_ON_CORE1 = True
+
+# Inbox message asking core 1 to reset the stats counters after core 0 has read them
+RESET_STATS = "reset_stats"
+# Pause after a render loop error so one that repeats every frame doesn't spin
+ERROR_BACKOFF_MS = 10
+
+
+class DoubleBuffer:
+    """
+    Lock-protected message handoff between the cores. Producers append to the
+    front list; the consumer swaps it with the (empty) back list under the lock
+    and then works through the back list without holding the lock.
+    """
+
+    def __init__(self):
+        self.lock = _thread.allocate_lock()
+        self.front = []
+        self.back = []
+
+    def put(self, item):
+        with self.lock:
+            self.front.append(item)
+
+    def take(self):
+        """Everything put since the last take, oldest first. Valid until the next take."""
+        self.back.clear()
+        with self.lock:
+            self.front, self.back = self.back, self.front
+        return self.back
+
+
+class Request:
+    """
+    A command waiting for the render core. response is set once, when it has run.
+    Core 0 sets cancelled when it gave up waiting, and the command is then skipped.
+    """
+
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.response = None
+        self.cancelled = False
+
+
+class RenderWorker:
+    """
+    Runs the Controller on core 1: command execution, effect math and display
+    updates all happen there, so nothing on core 0 ever touches graphics.
+    Core 0 only submits requests and reads back their responses.
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.inbox = DoubleBuffer()
+        self.running = False
+        self.stopped = True
+        self.errors = 0
+        # Last offline state sent to core 1, kept on core 0 so only changes are queued
+        self.sent_offline = controller.offline
+
+    def start(self):
+        self.running = True
+        self.stopped = False
+        _thread.start_new_thread(self.run, ())
+
+    def stop(self, timeout_ms=2000):
+        """Ask the render loop to finish and wait for it"""
+        self.running = False
+        start = time.ticks_ms()
+        while not self.stopped and time.ticks_diff(time.ticks_ms(), start) < timeout_ms:
+            time.sleep_ms(5)
+
+    def submit(self, cmd):
+        request = Request(cmd)
+        self.inbox.put(request)
+        return request
+
+    def set_offline(self, offline):
+        """Called every loop on core 0, only queues the change, not one message per loop until core 1 catches up"""
+        if offline != self.sent_offline:
+            self.sent_offline = offline
+            self.inbox.put(offline)
+
+    def reset_stats(self):
+        """Core 0 only reads the stats counters, core 1 resets them"""
+        self.inbox.put(RESET_STATS)
+
+    def run(self):
+        try:
+            while self.running:
+                try:
+                    self.step()
+                except Exception as e:
+                    # Keep rendering, core 0 is still waiting on requests
+                    print("Render error:", e)
+                    self.errors += 1
+                    time.sleep_ms(ERROR_BACKOFF_MS)
+        finally:
+            self.stopped = True
+
+    def step(self):
+        controller = self.controller
+        for message in self.inbox.take():
+            if isinstance(message, Request):
+                if message.cancelled:
+                    # The client already got a timeout, don't run it late
+                    continue
+                try:
+                    response = controller.handle_command(message.cmd)
+                except Exception as e:
+                    print("Render error:", e)
+                    self.errors += 1
+                    response = "ERROR: Connection failed"
+                message.response = response
+                continue
+            try:
+                if message == RESET_STATS:
+                    controller.reset_stats()
+                else:
+                    controller.set_offline(message)
+            except Exception as e:
+                print("Render error:", e)
+                self.errors += 1
+        if not controller.tick():
+            # Nothing due yet - short nap rather than a spin, so the other side gets the lock
+            time.sleep_ms(1)
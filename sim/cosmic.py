@@ -0,0 +1,36 @@
+"""Host stand-in for the Cosmic Unicorn driver."""
+
+# Simulator only: callables run with the graphics object on every update() of any instance
+update_hooks = []
+
+
+class CosmicUnicorn:
+    WIDTH = 32
+    HEIGHT = 32
+
+    def __init__(self):
+        self.brightness = 0.5
+        self.frames = 0
+        self.ambient_light = 2048
+        # Simulator only: callables run with the graphics object on every update()
+        self.update_hooks = []
+
+    def set_brightness(self, value):
+        self.brightness = max(0.0, min(1.0, value))
+
+    def get_brightness(self):
+        return self.brightness
+
+    def adjust_brightness(self, delta):
+        self.set_brightness(self.brightness + delta)
+
+    def light(self):
+        return self.ambient_light
+
+    def is_pressed(self, button):
+        return False
+
+    def update(self, graphics):
+        self.frames += 1
+        for hook in update_hooks + self.update_hooks:
+            hook(graphics)
@@ -0,0 +1,17 @@
+"""Host stand-in for the micropython module: the code emitters just run as plain Python."""
+
+
+def const(value):
+    return value
+
+
+def native(func):
+    return func
+
+
+def viper(func):
+    return func
+
+
+def mem_info(verbose=False):
+    pass
@@ -0,0 +1,42 @@
+"""Host stand-in for the network module. Set link_up = False to simulate the AP going away."""
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_GOT_IP = 3
+STAT_NO_AP_FOUND = -2
+
+link_up = True
+
+
+class WLAN:
+    def __init__(self, interface=STA_IF):
+        self.interface = interface
+        self.is_active = False
+        self.connecting = False
+
+    def active(self, value=None):
+        if value is not None:
+            self.is_active = value
+        return self.is_active
+
+    def connect(self, ssid, password):
+        self.connecting = True
+
+    def disconnect(self):
+        self.connecting = False
+
+    def isconnected(self):
+        return self.is_active and self.connecting and link_up
+
+    def status(self):
+        if self.isconnected():
+            return STAT_GOT_IP
+        if self.connecting:
+            return STAT_NO_AP_FOUND
+        return STAT_IDLE
+
+    def ifconfig(self):
+        return ("127.0.0.1", "255.0.0.0", "127.0.0.1", "127.0.0.1")
@@ -0,0 +1,49 @@
+"""Host stand-in for Pimoroni's picographics module, enough for the mascot code."""
+
+DISPLAY_COSMIC_UNICORN = 0
+PEN_RGB888 = 0
+
+WIDTH = 32
+HEIGHT = 32
+BYTES_PER_PIXEL = 4
+
+
+class PicoGraphics(bytearray):
+    """
+    RGB888 framebuffer like the real one: one little-endian uint32 0x00RRGGBB
+    per pixel. It is a bytearray so memoryview(graphics) works as on the board.
+    """
+
+    def __init__(self, display=DISPLAY_COSMIC_UNICORN, pen_type=PEN_RGB888):
+        super().__init__(WIDTH * HEIGHT * BYTES_PER_PIXEL)
+        self.pen = 0
+
+    def get_bounds(self):
+        return WIDTH, HEIGHT
+
+    def create_pen(self, r, g, b):
+        return ((r & 0xFF) << 16) | ((g & 0xFF) << 8) | (b & 0xFF)
+
+    def set_pen(self, pen):
+        self.pen = pen
+
+    def pixel(self, x, y):
+        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+            i = (y * WIDTH + x) * BYTES_PER_PIXEL
+            pen = self.pen
+            self[i] = pen & 0xFF
+            self[i + 1] = (pen >> 8) & 0xFF
+            self[i + 2] = (pen >> 16) & 0xFF
+
+    def rectangle(self, x, y, w, h):
+        for yy in range(y, y + h):
+            for xx in range(x, x + w):
+                self.pixel(xx, yy)
+
+    def clear(self):
+        self.rectangle(0, 0, WIDTH, HEIGHT)
+
+    def get_pixel(self, x, y):
+        """Simulator only: (r, g, b) at x, y"""
+        i = (y * WIDTH + x) * BYTES_PER_PIXEL
+        return self[i + 2], self[i + 1], self[i]
@@ -0,0 +1,85 @@
+"""
+Run the mascot code on a normal Python: puts the stand-in hardware modules in
+this directory on sys.path and adds the MicroPython-only bits of time and gc.
+
+    import simulator
+    clock = simulator.install(virtual=True)
+
+With virtual=True time only moves when something sleeps or calls
+clock.advance(), so replays run as fast as the CPU allows and are repeatable.
+"""
+import builtins
+import gc
+import os
+import sys
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(SIM_DIR)
+
+# ticks_ms() wraps at 2**30 on MicroPython
+TICKS_PERIOD = 1 << 30
+
+_real_sleep = time.sleep
+_real_monotonic = time.monotonic
+
+
+class Clock:
+    def __init__(self, virtual=False):
+        self.virtual = virtual
+        self.now_ms = 0.0
+        self.start = _real_monotonic()
+
+    def ms(self):
+        if self.virtual:
+            return self.now_ms
+        return (_real_monotonic() - self.start) * 1000.0
+
+    def ticks_ms(self):
+        return int(self.ms()) % TICKS_PERIOD
+
+    def ticks_us(self):
+        return int(self.ms() * 1000) % TICKS_PERIOD
+
+    def sleep(self, seconds):
+        if self.virtual:
+            self.now_ms += seconds * 1000.0
+        else:
+            _real_sleep(seconds)
+
+    def advance(self, ms):
+        """Move time on by ms - only sleeps for real when not virtual"""
+        self.sleep(ms / 1000.0)
+
+
+def ticks_diff(new, old):
+    return ((new - old + TICKS_PERIOD // 2) % TICKS_PERIOD) - TICKS_PERIOD // 2
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) % TICKS_PERIOD
+
+
+def install(virtual=False):
+    """Make the device modules importable here and return the clock they run on"""
+    for path in (ROOT, SIM_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    clock = Clock(virtual)
+    time.ticks_ms = clock.ticks_ms
+    time.ticks_us = clock.ticks_us
+    time.ticks_diff = ticks_diff
+    time.ticks_add = ticks_add
+    time.sleep = clock.sleep
+    time.sleep_ms = lambda ms: clock.sleep(ms / 1000.0)
+    time.sleep_us = lambda us: clock.sleep(us / 1000000.0)
+    # Viper type names used in annotations
+    for name in ("ptr8", "ptr16", "ptr32", "uint"):
+        if not hasattr(builtins, name):
+            setattr(builtins, name, int if name == "uint" else bytearray)
+    if not hasattr(gc, "mem_free"):
+        # Roughly what a Pico W has left after Wi-Fi is up
+        gc.mem_free = lambda: 150 * 1024
+        gc.mem_alloc = lambda: 0
+    return clock
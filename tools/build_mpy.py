@@ -0,0 +1,103 @@
+"""
+Build a deployable copy of the mascot with the big data modules precompiled to .mpy.
+
+Parsing makey_arrays.py and the animation frame files from source is most of the
+boot time on the Pico, so these get compiled with mpy-cross on the host and copied
+to the board instead of the .py files. Everything else is copied as-is.
+
+    pip install mpy-cross
+    python tools/build_mpy.py
+    mpremote cp -r build/* :
+
+makey_arrays.crc is written next to it, a CRC32 of the source, so the base render
+cache (base.raw) on the board rebuilds itself when the art changes.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR = os.path.join(ROOT, "build")
+
+# Pure data modules - these are the ones worth precompiling
+DATA_MODULES = [
+    "makey_arrays",
+    "laugh",
+    "leftarm",
+    "rightarm",
+    "eyes_move",
+    "leftarm_up",
+    "leftarm_down",
+    "rightarm_up",
+    "rightarm_down",
+    "dance_1",
+]
+
+# Device code, copied as source so it's easy to poke at from the REPL
+SOURCE_MODULES = [
+    "main",
+    "animations",
+    "connect_wifi",
+    "controller",
+    "command_log",
+    "display",
+    "effect_cache",
+    "render_worker",
+    "transitions",
+    "fire",
+    "eyes",
+]
+
+# Packages copied as source, whole directory
+SOURCE_PACKAGES = [
+    "effects",
+]
+
+
+def find_mpy_cross():
+    try:
+        import mpy_cross
+        return [sys.executable, "-m", "mpy_cross"]
+    except ImportError:
+        pass
+    if shutil.which("mpy-cross"):
+        return ["mpy-cross"]
+    sys.exit("mpy-cross not found, install it with: pip install mpy-cross")
+
+
+def main():
+    mpy_cross = find_mpy_cross()
+    if os.path.isdir(BUILD_DIR):
+        shutil.rmtree(BUILD_DIR)
+    os.makedirs(BUILD_DIR)
+
+    for name in DATA_MODULES:
+        src = os.path.join(ROOT, name + ".py")
+        if not os.path.exists(src):
+            print("skip", name, "(not in tree)")
+            continue
+        dst = os.path.join(BUILD_DIR, name + ".mpy")
+        subprocess.check_call(mpy_cross + ["-o", dst, src])
+        print("compiled", name + ".mpy", os.path.getsize(src), "->", os.path.getsize(dst), "bytes")
+
+    # Version stamp animations.py keys the base render cache on
+    with open(os.path.join(ROOT, "makey_arrays.py"), "rb") as f:
+        stamp = f"{zlib.crc32(f.read()):08x}"
+    with open(os.path.join(BUILD_DIR, "makey_arrays.crc"), "w") as f:
+        f.write(stamp + "\n")
+    print("stamped makey_arrays.crc", stamp)
+
+    for name in SOURCE_MODULES:
+        shutil.copy(os.path.join(ROOT, name + ".py"), BUILD_DIR)
+        print("copied", name + ".py")
+
+    for name in SOURCE_PACKAGES:
+        shutil.copytree(os.path.join(ROOT, name), os.path.join(BUILD_DIR, name),
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        print("copied", name + "/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Load generator and latency benchmark for the port-5000 control server.
+
+Runs many concurrent clients against the mascot (or a local simulated server),
+mixing the long one-shot commands with instant ones, and reports connect and
+response latency percentiles, refused / timed out connections and what the
+load does to the frame rate (read from the server's stats command).
+
+    python tools/loadgen.py --host 192.168.1.50 --clients 8 --duration 30
+    python tools/loadgen.py --sim --clients 4
+
+--sim starts tools/sim_server.py on localhost first and stops it afterwards.
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PORT = 5000
+
+# Default command mix, as name:weight. laugh blocks the server for seconds on
+# the board; the rest answer straight away. static and eyes_moving always answer
+# ERROR in this tree (no draw_static, no eyes_move frames), so they are left out.
+DEFAULT_MIX = "red:4,blue:2,rainbow:4,fire:2,laugh:2"
+LONG_COMMANDS = ("laugh", "eyes_moving", "leftarm_up", "leftarm_down",
+                 "rightarm_up", "rightarm_down", "dance_1", "dance_2")
+
+
+def parse_mix(mix):
+    commands = []
+    weights = []
+    for item in mix.split(","):
+        name, _, weight = item.partition(":")
+        commands.append(name.strip())
+        weights.append(float(weight or 1))
+    return commands, weights
+
+
+def send_command(host, port, cmd, timeout):
+    """
+    One request on its own connection, like the phone app does.
+    Returns (outcome, connect_ms, response_ms, response) where outcome is
+    ok / refused / timeout / error.
+    """
+    start = time.perf_counter()
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    except ConnectionRefusedError:
+        return "refused", None, None, None
+    except socket.timeout:
+        return "timeout", None, None, None
+    except OSError as e:
+        return "error", None, None, str(e)
+    connected = time.perf_counter()
+    try:
+        sock.sendall(cmd.encode())
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(1024)
+            if not chunk:
+                break
+            data += chunk
+        done = time.perf_counter()
+    except socket.timeout:
+        return "timeout", (connected - start) * 1000, None, None
+    except OSError as e:
+        return "error", (connected - start) * 1000, None, str(e)
+    finally:
+        sock.close()
+    response = data.decode(errors="replace").strip()
+    outcome = "ok" if response.startswith("OK") else "error"
+    return outcome, (connected - start) * 1000, (done - connected) * 1000, response
+
+
+def parse_stats(response):
+    stats = {}
+    if response and response.startswith("OK:"):
+        for field in response[3:].split():
+            key, _, value = field.partition("=")
+            try:
+                stats[key] = float(value)
+            except ValueError:
+                pass
+    return stats
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.outcomes = {}
+        self.connect_ms = []
+        self.response_ms = {"instant": [], "long": [], "error": []}
+        self.errors = []
+
+    def add(self, cmd, outcome, connect_ms, response_ms, response):
+        with self.lock:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            if connect_ms is not None:
+                self.connect_ms.append(connect_ms)
+            if response_ms is not None:
+                # An instant ERROR reply to a long command would skew the long percentiles
+                if outcome != "ok":
+                    kind = "error"
+                elif cmd in LONG_COMMANDS:
+                    kind = "long"
+                else:
+                    kind = "instant"
+                self.response_ms[kind].append(response_ms)
+            if outcome == "error" and len(self.errors) < 5:
+                self.errors.append((cmd, response))
+
+
+def client(host, port, commands, weights, deadline, timeout, think_ms, results, rng):
+    while time.perf_counter() < deadline:
+        cmd = rng.choices(commands, weights)[0]
+        results.add(cmd, *send_command(host, port, cmd, timeout))
+        if think_ms:
+            time.sleep(rng.uniform(0, think_ms) / 1000)
+
+
+def sample_fps(host, port, duration, timeout, interval=1.0):
+    """Poll stats for duration seconds, return the fps and stall figures seen"""
+    fps = []
+    stalls = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        outcome, _, _, response = send_command(host, port, "stats", timeout)
+        stats = parse_stats(response)
+        if "fps" in stats:
+            fps.append(stats["fps"])
+            stalls.append(stats.get("max_stall_ms", 0))
+        time.sleep(interval)
+    return fps, stalls
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def summary(label, values):
+    if not values:
+        return f"  {label:<18} no samples"
+    return (f"  {label:<18} n={len(values):<6} p50={percentile(values, 50):8.1f}  p90={percentile(values, 90):8.1f}  "
+            f"p99={percentile(values, 99):8.1f}  max={max(values):8.1f} ms")
+
+
+def fps_summary(label, fps, stalls):
+    if not fps:
+        return f"  {label:<18} no stats replies"
+    return f"  {label:<18} fps avg={sum(fps) / len(fps):5.1f} min={min(fps):5.1f}  worst stall={max(stalls):.0f} ms"
+
+
+def wait_for_server(host, port, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--sim", action="store_true", help="start a simulated server on localhost")
+    parser.add_argument("--single-core", action="store_true", help="with --sim, render on the server's main thread")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="commands to send as name:weight,...")
+    parser.add_argument("--timeout", type=float, default=15.0, help="per request timeout in seconds")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="max random pause between a client's requests")
+    parser.add_argument("--baseline", type=float, default=3.0, help="seconds of frame rate sampling before and after the load")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    if args.sim:
+        args.host = "127.0.0.1"
+        server_args = [sys.executable, os.path.join(ROOT, "tools", "sim_server.py"), "--quiet"]
+        if args.single_core:
+            server_args.append("--single-core")
+        server = subprocess.Popen(server_args)
+    try:
+        if not wait_for_server(args.host, PORT):
+            sys.exit(f"No server on {args.host}:{PORT}")
+        # Switch to an animated mode so there are frames to count
+        send_command(args.host, PORT, "rainbow", args.timeout)
+
+        idle_fps, idle_stalls = sample_fps(args.host, PORT, args.baseline, args.timeout)
+
+        commands, weights = parse_mix(args.mix)
+        results = Results()
+        deadline = time.perf_counter() + args.duration
+        threads = []
+        for i in range(args.clients):
+            rng = random.Random(args.seed + i)
+            t = threading.Thread(target=client, args=(args.host, PORT, commands, weights, deadline,
+                                                      args.timeout, args.think_ms, results, rng))
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        load_fps, load_stalls = sample_fps(args.host, PORT, args.duration, args.timeout)
+        for t in threads:
+            t.join()
+
+        send_command(args.host, PORT, "rainbow", args.timeout)
+        after_fps, after_stalls = sample_fps(args.host, PORT, args.baseline, args.timeout)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    total = sum(results.outcomes.values())
+    print(f"{args.clients} clients, {args.duration:.0f}s, {total} requests "
+          f"({total / args.duration:.1f}/s)")
+    print("  outcomes          " + ", ".join(f"{k}={v}" for k, v in sorted(results.outcomes.items())))
+    print(summary("connect", results.connect_ms))
+    print(summary("response instant", results.response_ms["instant"]))
+    print(summary("response long", results.response_ms["long"]))
+    print(summary("response error", results.response_ms["error"]))
+    print(fps_summary("before load", idle_fps, idle_stalls))
+    print(fps_summary("under load", load_fps, load_stalls))
+    print(fps_summary("after load", after_fps, after_stalls))
+    for cmd, response in results.errors:
+        print("  error:", cmd, "->", response)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Stress the core 0 / core 1 handoff with CPython threads on the simulator.
+
+1. Many producer threads push numbered messages through a DoubleBuffer while a
+   consumer drains it. Every message must arrive exactly once and in order per
+   producer.
+2. Producer threads fire instant commands at a RenderWorker while it renders
+   rainbow. Every request must get its own, correct response, the worker must
+   not hit any errors and frames must keep coming.
+
+    python tools/render_stress.py --producers 8 --messages 20000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "sim"))
+
+import simulator
+
+
+def stress_double_buffer(producers, messages):
+    from render_worker import DoubleBuffer
+
+    buffer = DoubleBuffer()
+    done = threading.Event()
+    received = {p: [] for p in range(producers)}
+
+    def produce(p):
+        for i in range(messages):
+            buffer.put((p, i))
+
+    def consume():
+        while True:
+            finished = done.is_set()
+            for p, i in buffer.take():
+                received[p].append(i)
+            if finished:
+                break
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    done.set()
+    consumer.join()
+    elapsed = time.perf_counter() - start
+
+    ok = all(received[p] == list(range(messages)) for p in range(producers))
+    total = producers * messages
+    print(f"double buffer: {total} messages from {producers} producers in {elapsed:.2f}s "
+          f"({total / elapsed:.0f}/s) - {'OK' if ok else 'LOST OR REORDERED MESSAGES'}")
+    return ok
+
+
+def stress_worker(producers, requests, duration_limit):
+    from cosmic import CosmicUnicorn
+    from picographics import PicoGraphics, DISPLAY_COSMIC_UNICORN
+    from makey_arrays import mask_red, mask_white, base_image
+    from animations import AnimationManager
+    from display import Display
+    from controller import Controller
+    from render_worker import RenderWorker
+
+    cu = CosmicUnicorn()
+    graphics = PicoGraphics(display=DISPLAY_COSMIC_UNICORN)
+    # Keep the device code's per-frame debug prints out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        display = Display(cu, graphics, brightness=0.5)
+        anim_manager = AnimationManager(graphics, mask_red, mask_white, base_image)
+        controller = Controller(display, graphics, anim_manager)
+        controller.handle_command("rainbow")
+    worker = RenderWorker(controller)
+
+    expected = {"red": "OK: RED mode", "blue": "OK: BLUE mode", "rainbow": "OK: RAINBOW mode 🌈",
+                "fire": "OK: FIRE mode 🔥"}
+    failures = []
+    latencies = []
+    lock = threading.Lock()
+
+    def produce(p):
+        rng = random.Random(p)
+        for _ in range(requests):
+            if rng.random() < 0.2:
+                level = rng.randrange(101)
+                cmd, want = f"brightness {level}", f"OK: brightness {level}%"
+            else:
+                cmd = rng.choice(sorted(expected))
+                want = expected[cmd]
+            start = time.perf_counter()
+            request = worker.submit(cmd)
+            deadline = start + duration_limit
+            while request.response is None and time.perf_counter() < deadline:
+                time.sleep(0.0005)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+                if request.response != want:
+                    failures.append((cmd, request.response))
+
+    frames_before = controller.frames
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        worker.start()
+        threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        worker.stop()
+
+    total = producers * requests
+    frames = controller.frames - frames_before
+    latencies.sort()
+    ok = not failures and worker.errors == 0
+    print(f"render worker: {total} requests from {producers} producers in {elapsed:.2f}s "
+          f"({total / elapsed:.0f}/s), {frames} display updates ({frames / elapsed:.1f}/s)")
+    print(f"  response latency p50={latencies[len(latencies) // 2]:.2f} ms "
+          f"p99={latencies[int(len(latencies) * 0.99)]:.2f} ms max={latencies[-1]:.2f} ms")
+    print(f"  worker errors={worker.errors}, wrong or missing responses={len(failures)} - {'OK' if ok else 'FAILED'}")
+    for cmd, response in failures[:5]:
+        print("   ", cmd, "->", response)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=20000, help="messages per producer for the double buffer test")
+    parser.add_argument("--requests", type=int, default=200, help="commands per producer for the worker test")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds to wait for any one response")
+    args = parser.parse_args()
+
+    simulator.install()
+    os.chdir(tempfile.mkdtemp(prefix="makey_stress_"))
+
+    ok = stress_double_buffer(args.producers, args.messages)
+    ok = stress_worker(args.producers, args.requests, args.timeout) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
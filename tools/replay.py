@@ -0,0 +1,135 @@
+"""
+Replay a recorded command log through the simulator and check the output frames.
+
+Pull the log off the board after a show, then replay it as fast as possible and
+save a checksum of every frame pushed to the display:
+
+    mpremote cp :commands.log .
+    python tools/replay.py commands.log --write-golden golden.txt
+
+After changing AnimationManager, replay it again against the golden file; any
+frame that isn't bit-exact is reported and the exit status is 1:
+
+    python tools/replay.py commands.log --golden golden.txt
+
+--realtime keeps the original timing between commands instead.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "sim"))
+
+import simulator
+
+
+def read_golden(path):
+    with open(path) as f:
+        return [int(line.split()[1], 16) for line in f if line.strip()]
+
+
+def write_golden(path, checksums):
+    with open(path, "w") as f:
+        for i, crc in enumerate(checksums):
+            f.write(f"{i} {crc:08x}\n")
+
+
+def replay(commands, clock, tail_ms=2000, max_gap_ms=60000, verbose=False):
+    """Run the commands through the same startup and main loop code as main.py, return the frame checksums"""
+    from cosmic import CosmicUnicorn
+    from picographics import PicoGraphics, DISPLAY_COSMIC_UNICORN
+    from makey_arrays import mask_red, mask_white, base_image
+    from animations import AnimationManager
+    from controller import Controller
+    from display import Display
+
+    checksums = []
+    cu = CosmicUnicorn()
+    # Brightness is applied in the driver, so it goes into the checksum too
+    cu.update_hooks.append(lambda graphics: checksums.append(
+        zlib.crc32(graphics, zlib.crc32(str(round(cu.brightness, 4)).encode()))))
+    graphics = PicoGraphics(display=DISPLAY_COSMIC_UNICORN)
+
+    out = sys.stdout if verbose else io.StringIO()
+    with contextlib.redirect_stdout(out):
+        display = Display(cu, graphics, brightness=0.5)
+        anim_manager = AnimationManager(graphics, mask_red, mask_white, base_image)
+        controller = Controller(display, graphics, anim_manager)
+        anim_manager.draw_red()
+        display.update(graphics)
+
+        start = clock.ms()
+        at = 0
+        previous = 0
+        for elapsed, cmd in commands + [(None, None)]:
+            if cmd is None:
+                at = max(at, clock.ms() - start) + tail_ms
+            else:
+                at += min(elapsed - previous, max_gap_ms)
+                previous = elapsed
+            while clock.ms() - start < at:
+                controller.tick()
+                clock.advance(1)
+            if cmd is not None:
+                try:
+                    response = controller.handle_command(cmd)
+                except Exception as e:
+                    # Same reply the board sends, the show carries on
+                    print("replay:", cmd, "raised", repr(e), file=sys.stderr)
+                    response = "ERROR: Connection failed"
+                print("replay:", cmd, "->", response)
+    return checksums
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="commands.log pulled from the board")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded timing instead of running flat out")
+    parser.add_argument("--golden", help="compare frame checksums against this file")
+    parser.add_argument("--write-golden", help="write frame checksums to this file")
+    parser.add_argument("--tail-ms", type=int, default=2000, help="keep rendering this long after the last command")
+    parser.add_argument("--max-gap-ms", type=int, default=60000, help="squeeze longer gaps (e.g. reboots) down to this")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for effects that use random")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the device's own output")
+    args = parser.parse_args()
+
+    clock = simulator.install(virtual=not args.realtime)
+    from command_log import read_command_log
+    commands = read_command_log(os.path.abspath(args.log))
+    golden = read_golden(os.path.abspath(args.golden)) if args.golden else None
+    golden_out = os.path.abspath(args.write_golden) if args.write_golden else None
+
+    random.seed(args.seed)
+    # Run somewhere empty so every replay starts without a base.raw cache
+    os.chdir(tempfile.mkdtemp(prefix="makey_replay_"))
+
+    wall_start = time.perf_counter()
+    checksums = replay(commands, clock, args.tail_ms, args.max_gap_ms, args.verbose)
+    wall = time.perf_counter() - wall_start
+    print(f"{len(commands)} commands, {len(checksums)} frames, "
+          f"{clock.ms() / 1000:.1f}s show time in {wall:.2f}s")
+
+    if golden_out:
+        write_golden(golden_out, checksums)
+        print("wrote", golden_out)
+
+    if golden is not None:
+        mismatches = [i for i in range(max(len(golden), len(checksums)))
+                      if i >= len(golden) or i >= len(checksums) or golden[i] != checksums[i]]
+        if len(golden) != len(checksums):
+            print(f"frame count differs: golden {len(golden)}, replay {len(checksums)}")
+        if mismatches:
+            print(f"{len(mismatches)} frames differ, first at frame {mismatches[0]}")
+            sys.exit(1)
+        print("all frames match golden")
+
+
+if __name__ == "__main__":
+    main()
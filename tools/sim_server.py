@@ -0,0 +1,42 @@
+"""
+Run main.py on this machine against the simulated display and network, so the
+control server on port 5000 can be driven without a board:
+
+    python tools/sim_server.py
+
+Runs in a scratch directory so base.raw and commands.log don't end up in the tree.
+The device code's own output goes to the terminal unless --quiet is given.
+"""
+import argparse
+import os
+import runpy
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "sim"))
+
+import simulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quiet", action="store_true", help="hide the device code's output")
+    parser.add_argument("--single-core", action="store_true", help="render on the main thread like before the render worker")
+    args = parser.parse_args()
+
+    simulator.install()
+    if args.single_core:
+        import render_worker
+        render_worker.RENDER_ON_CORE1 = False
+    os.chdir(tempfile.mkdtemp(prefix="makey_sim_"))
+    if args.quiet:
+        sys.stdout = open(os.devnull, "w")
+    try:
+        runpy.run_path(os.path.join(ROOT, "main.py"), run_name="__main__")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
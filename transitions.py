@@ -0,0 +1,147 @@
+import random
+import micropython
+
+from display import WIDTH, HEIGHT
+
+NONE = "none"
+FADE = "fade"
+WIPE = "wipe"
+DISSOLVE = "dissolve"
+KINDS = (NONE, FADE, WIPE, DISSOLVE)
+
+DEFAULT_KIND = FADE
+DEFAULT_FRAMES = 10
+
+
+# The blend loops read the old frame from work[0:size], the new one from
+# work[size:2 * size] and dissolve thresholds from work[2 * size:]
+# (viper functions take at most four arguments).
+
+@micropython.viper
+def _fade(dst: ptr8, work: ptr8, size: int, a: int):
+    """dst = old * (256 - a) / 256 + new * a / 256, byte by byte"""
+    b = 256 - a
+    i = 0
+    while i < size:
+        dst[i] = (work[i] * b + work[size + i] * a) >> 8
+        i += 1
+
+
+@micropython.viper
+def _wipe(dst: ptr8, work: ptr8, size: int, edge: int):
+    """Columns left of edge come from new, the rest from old"""
+    i = 0
+    x = 0
+    while i < size:
+        if x < edge:
+            j = size + i
+        else:
+            j = i
+        dst[i] = work[j]
+        dst[i + 1] = work[j + 1]
+        dst[i + 2] = work[j + 2]
+        i += 4
+        x = (x + 1) & 31  # WIDTH is 32
+
+
+@micropython.viper
+def _dissolve(dst: ptr8, work: ptr8, size: int, a: int):
+    """Pixels whose random threshold is below a come from new, the rest from old"""
+    thresholds = size * 2
+    i = 0
+    p = 0
+    while i < size:
+        if work[thresholds + p] < a:
+            j = size + i
+        else:
+            j = i
+        dst[i] = work[j]
+        dst[i + 1] = work[j + 1]
+        dst[i + 2] = work[j + 2]
+        i += 4
+        p += 1
+
+
+class Transition:
+    """
+    Blends from the frame on screen when begin() is called to whatever gets
+    drawn after it, over a number of display updates.
+
+    outgoing holds the old frame and incoming the new one, both preallocated.
+    blend() saves the freshly drawn frame to incoming and writes the mix into
+    the framebuffer for the display. restore() then puts incoming back so
+    incremental drawing carries on from the real frame.
+    Blending is integer fixed point (alpha 0-256) in one pass over the buffer.
+    """
+
+    def __init__(self, framebuffer, kind=DEFAULT_KIND, frames=DEFAULT_FRAMES):
+        self.fb = framebuffer
+        size = len(framebuffer)
+        self.size = size
+        self.work = bytearray(size * 2 + WIDTH * HEIGHT)
+        work = memoryview(self.work)
+        self.outgoing = work[:size]
+        self.incoming = work[size:size * 2]
+        # Order pixels appear in for dissolve, fixed so every dissolve looks the same
+        thresholds = work[size * 2:]
+        for i in range(WIDTH * HEIGHT):
+            thresholds[i] = random.getrandbits(8)
+        self.kind = kind
+        self.frames = frames
+        self.step = 0
+        self.active = False
+
+    def configure(self, kind, frames=None):
+        if kind not in KINDS:
+            raise ValueError("unknown transition " + kind)
+        if frames is not None and frames < 0:
+            raise ValueError("transition frames can't be negative")
+        self.kind = kind
+        if frames is not None:
+            self.frames = frames
+        if self.kind == NONE or self.frames == 0 or self.step >= self.frames:
+            # Switched off or shortened past where it is mid-blend, the framebuffer
+            # already holds the real frame
+            self.active = False
+
+    def alpha(self):
+        # Last step is all new frame, static modes never redraw after it
+        return min(self.step, self.frames) * 256 // self.frames
+
+    def mix(self, dst, alpha):
+        """Blend outgoing and incoming into dst"""
+        if self.kind == WIPE:
+            _wipe(dst, self.work, self.size, (alpha * (WIDTH + 1)) >> 8)
+        elif self.kind == DISSOLVE:
+            _dissolve(dst, self.work, self.size, alpha)
+        else:
+            _fade(dst, self.work, self.size, alpha)
+
+    def begin(self):
+        """Call with the old frame still in the framebuffer, before drawing the new one"""
+        if self.kind == NONE or self.frames == 0:
+            self.active = False
+            return
+        if self.active:
+            # Already mid-transition: start from what is actually on screen
+            self.incoming[:] = self.fb
+            self.mix(self.outgoing, self.alpha())
+        else:
+            self.outgoing[:] = self.fb
+        self.step = 0
+        self.active = True
+
+    def blend(self):
+        """Mix the next step into the framebuffer. Returns False when there is no transition running."""
+        if not self.active:
+            return False
+        self.step += 1
+        self.incoming[:] = self.fb
+        self.mix(self.fb, self.alpha())
+        return True
+
+    def restore(self):
+        """Put the real frame back after it has been shown"""
+        self.fb[:] = self.incoming
+        if self.step >= self.frames:
+            self.active = False